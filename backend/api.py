@@ -1,6 +1,9 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from werkzeug.serving import make_server
 import json
 import os
+import signal
+import sys
 import ping3
 import requests
 import socket
@@ -8,20 +11,39 @@ from datetime import datetime, timedelta
 import threading
 import time
 import logging
-from typing import Dict, List, Any
+import math
+import hmac
+from functools import wraps
+from typing import Dict, List, Any, Optional, Tuple
+
+import metrics
+from log_config import configure_logging
+from profiling import profiler, tracer
+from scheduler import AdaptivePolicy, ProbeSchedule
+from notifications import NotificationDispatcher
+from downsampling import StatusBuckets, lttb
+from dns_probe import DnsMultiplexer, parse_server
+from http_tracing import traced_session
+from manual_checks import ManualCheckRunner, RateLimited
+from results import CheckResult, Status, iso_timestamp
+from clock import SYSTEM_CLOCK, Clock
+from history_storage import HistoryStorage, create_storage, decode_cursor, empty_statistics, encode_cursor
 
 app = Flask(__name__)
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO)
+# Configuration du logging (écriture déportée dans un thread via une file)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 class MonitoringService:
-    def __init__(self):
+    def __init__(self, clock: Clock = None, project_root: str = None, autostart: bool = True):
         # Configuration avec valeurs fixes - À LA RACINE DU PROJET
         # On remonte d'un niveau depuis backend/ pour atteindre la racine
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)  # Remonte au parent
+        project_root = project_root or os.path.dirname(current_dir)  # Remonte au parent
+        
+        # Horloge du moteur (simulée en mode replay, voir simulation.py)
+        self.clock = clock or SYSTEM_CLOCK
         
         self.config_file = os.path.join(project_root, 'config.json')
         self.history_dir = os.path.join(project_root, 'history')
@@ -29,12 +51,27 @@ class MonitoringService:
         self.check_interval = 10
         self.max_probes = 100
         self.history_retention_days = 30
+        self.snapshot_file = os.path.join(self.history_dir, 'status_snapshot.json')
+        self.snapshot_interval = 30
+        self.snapshot_max_age = 86400
+        # Délai maximal d'une lecture multi-jours (au-delà : résultat partiel)
+        self.history_query_timeout = 10.0
         
         self.probes = []
-        self.current_status = {}
+        self.current_status: Dict[str, CheckResult] = {}
         self.previous_status = {}
+        self.adaptive_policy = AdaptivePolicy()
+        self.schedules: Dict[str, ProbeSchedule] = {}
+        self.notifier = NotificationDispatcher()
+        self.dns = DnsMultiplexer()
+        self.manual_checks = ManualCheckRunner(self.check_probe, clock=self.clock)
+        self.history_storage: HistoryStorage = create_storage('json', self.history_dir, clock=self.clock)
+        # Résultats scriptés à la place des vérifications réelles (simulation)
+        self.prober = None
+        self.wakeup = threading.Event()
         self.monitoring_active = False
-        self.last_history_save = time.time()
+        self.last_history_save = self.clock.time()
+        self.last_snapshot_save = self.clock.time()
         
         # Debug : afficher les chemins calculés
         logger.info(f"Dossier courant: {current_dir}")
@@ -60,8 +97,12 @@ class MonitoringService:
         # Charger la configuration
         self.load_config()
         
+        # Reprendre le dernier état connu (servi comme "stale" jusqu'à la première vérification)
+        self.load_status_snapshot()
+        
         # Démarrer le monitoring en arrière-plan
-        self.start_monitoring()
+        if autostart:
+            self.start_monitoring()
     
     def ensure_history_directory(self):
         """S'assure que le dossier history existe à la racine du projet"""
@@ -94,6 +135,13 @@ class MonitoringService:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                     self.probes = config.get('probes', [])
+                    self.adaptive_policy = AdaptivePolicy(config.get('settings', {}).get('adaptive'))
+                    probe_ids = {p['id'] for p in self.probes}
+                    self.schedules = {k: v for k, v in self.schedules.items() if k in probe_ids}
+                    self.configure_notifications(config.get('notifications'))
+                    self.configure_history_storage(config.get('settings', {}))
+                    self.history_query_timeout = float(config.get('settings', {}).get('history_query_timeout', 10))
+                    self.manual_checks.configure(config.get('settings', {}).get('manual_checks'))
                     
                     # Limiter le nombre de sondes
                     if len(self.probes) > self.max_probes:
@@ -101,6 +149,7 @@ class MonitoringService:
                         logger.warning(f"Nombre de sondes limité à {self.max_probes}")
                     
                     logger.info(f"Configuration chargée avec succès: {len(self.probes)} sondes")
+                    self.wakeup.set()
             else:
                 logger.error(f"Fichier de configuration non trouvé: {self.config_file}")
                 logger.error(f"Fichiers présents dans le dossier: {os.listdir(os.path.dirname(self.config_file))}")
@@ -109,10 +158,92 @@ class MonitoringService:
             logger.error(f"Erreur lors du chargement de la configuration: {e}")
             self.probes = []
     
+    def save_status_snapshot(self):
+        """Écrit un instantané compact du statut courant (écriture atomique)"""
+        try:
+            previous_status = dict(self.previous_status)
+            snapshot = {
+                "saved_at": self.clock.time(),
+                "probes": {
+                    probe_id: {
+                        "result": status.to_row(),
+                        "previous_status": previous_status.get(probe_id)
+                    }
+                    for probe_id, status in list(self.current_status.items())
+                }
+            }
+            
+            temp_file = f"{self.snapshot_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                # dumps (encodeur C) puis une seule écriture : json.dump encode en Python pur
+                f.write(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')))
+            os.replace(temp_file, self.snapshot_file)
+            self.last_snapshot_save = self.clock.time()
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde de l'instantané de statut: {e}")
+    
+    def load_status_snapshot(self):
+        """Recharge le dernier instantané : statut servi comme périmé, transitions reprises"""
+        try:
+            if not os.path.exists(self.snapshot_file):
+                return
+            
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            
+            age = self.clock.time() - snapshot.get('saved_at', 0)
+            if age > self.snapshot_max_age:
+                logger.info(f"Instantané de statut ignoré (trop ancien: {age:.0f}s)")
+                return
+            
+            probes = {p['id']: p for p in self.probes}
+            restored = 0
+            for probe_id, state in snapshot.get('probes', {}).items():
+                if probe_id not in probes or probe_id in self.current_status:
+                    continue
+                if 'result' in state:
+                    result = CheckResult.from_row(state['result'], probes[probe_id], stale=True)
+                else:
+                    result = CheckResult.from_dict(state['status'], probes[probe_id], stale=True)
+                self.current_status[probe_id] = result
+                if state.get('previous_status'):
+                    self.previous_status.setdefault(probe_id, state['previous_status'])
+                restored += 1
+            
+            logger.info(f"♻️  Instantané de statut rechargé: {restored} sondes (âge {age:.0f}s)")
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement de l'instantané de statut: {e}")
+    
+    def configure_notifications(self, notifications_config: Dict[str, Any] = None):
+        """(Re)crée le pipeline de notifications à partir de la configuration"""
+        previous = self.notifier
+        previous.stop()
+        notifier = NotificationDispatcher(notifications_config)
+        # Les événements pas encore envoyés passent au nouveau pipeline
+        previous.hand_over(notifier)
+        self.notifier = notifier
+        self.notifier.start()
+    
+    def configure_history_storage(self, settings: Dict[str, Any]):
+        """Sélectionne le backend d'historique (settings.history_backend)"""
+        backend = settings.get('history_backend', 'json')
+        if backend == self.history_storage.name:
+            self.history_storage.configure(settings)
+            return
+        try:
+            storage = create_storage(backend, self.history_dir, settings, clock=self.clock)
+        except Exception as e:
+            logger.error(f"Backend d'historique '{backend}' indisponible, conservation de '{self.history_storage.name}': {e}")
+            return
+        self.history_storage.close()
+        self.history_storage = storage
+        logger.info(f"Backend d'historique: {backend}")
+    
     def ping_check(self, target: str, timeout: int = 5, threshold: int = 100) -> Dict[str, Any]:
         """Effectue un ping vers la cible"""
         try:
-            response_time = ping3.ping(target, timeout=timeout)
+            with tracer.span('request', type='ping'):
+                response_time = ping3.ping(target, timeout=timeout)
             
             if response_time is None:
                 return {
@@ -145,7 +276,13 @@ class MonitoringService:
         """Effectue une vérification HTTP"""
         try:
             start_time = time.time()
-            response = requests.get(target, timeout=timeout, allow_redirects=True)
+            with tracer.span('request', type='http'):
+                if tracer.enabled:
+                    # Résolution et connexion tracées séparément (voir http_tracing.py)
+                    with traced_session() as session:
+                        response = session.get(target, timeout=timeout, allow_redirects=True)
+                else:
+                    response = requests.get(target, timeout=timeout, allow_redirects=True)
             response_time = (time.time() - start_time) * 1000
             
             if response.status_code == expected_status:
@@ -179,10 +316,13 @@ class MonitoringService:
         """Effectue une vérification TCP"""
         try:
             start_time = time.time()
+            with tracer.span('resolve', type='tcp'):
+                address = socket.gethostbyname(target)
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(timeout)
             
-            result = sock.connect_ex((target, port))
+            with tracer.span('connect', type='tcp'):
+                result = sock.connect_ex((address, port))
             response_time = (time.time() - start_time) * 1000
             sock.close()
             
@@ -206,11 +346,77 @@ class MonitoringService:
                 "error": str(e)
             }
     
-    def check_probe(self, probe: Dict[str, Any]) -> Dict[str, Any]:
-        """Vérifie une sonde selon son type"""
-        timestamp = datetime.now().isoformat()
+    def dns_checks(self, probes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vérifie des sondes DNS en un seul lot (requêtes envoyées ensemble, une socket)"""
+        queries = []
+        for probe in probes:
+            host, port = parse_server(probe['target'], probe.get('port', 53))
+            queries.append({
+                "name": probe.get('query', 'example.com'),
+                "record_type": probe.get('record_type', 'A'),
+                "server": host,
+                "port": port,
+                "timeout": probe.get('timeout', 5)
+            })
         
-        if probe['type'] == 'ping':
+        with tracer.span('request', type='dns', queries=len(queries)):
+            responses = self.dns.query_many(queries)
+        
+        return [self.dns_result(probe, response) for probe, response in zip(probes, responses)]
+    
+    def dns_result(self, probe: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+        """Évalue une réponse DNS : RCODE attendu, réponses attendues, seuil de latence"""
+        if response.get('error'):
+            return {
+                "status": "timeout" if response['error'] == "Timeout" else "error",
+                "response_time": None,
+                "rcode": None,
+                "answers": [],
+                "error": response['error']
+            }
+        
+        answers = [answer['value'] for answer in response['answers']]
+        latency_us = response['latency_us']
+        result = {
+            "status": "online",
+            "response_time": round(latency_us / 1000, 3),
+            "response_time_us": latency_us,
+            "rcode": response['rcode'],
+            "answers": answers,
+            "error": None
+        }
+        
+        expected_rcode = probe.get('expected_rcode', 'NOERROR').upper()
+        expected_answer = probe.get('expected_answer')
+        if isinstance(expected_answer, str):
+            expected_answer = [expected_answer]
+        normalized = {answer.rstrip('.').lower() for answer in answers}
+        
+        if response['rcode'] != expected_rcode:
+            result.update(status="error", error=f"RCODE {response['rcode']} (attendu: {expected_rcode})")
+        elif expected_answer and not all(a.rstrip('.').lower() in normalized for a in expected_answer):
+            result.update(status="error", error=f"Réponse inattendue: {', '.join(answers) or 'aucune'}")
+        elif latency_us / 1000 > probe.get('threshold', 100):
+            result["status"] = "slow"
+        
+        return result
+    
+    def prefetch_dns(self, probes: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Résultats des sondes DNS d'un tour, obtenus en un seul lot"""
+        dns_probes = [p for p in probes if p['type'] == 'dns']
+        if not dns_probes or self.prober is not None:
+            return {}
+        return {probe['id']: result for probe, result in zip(dns_probes, self.dns_checks(dns_probes))}
+    
+    def check_probe(self, probe: Dict[str, Any], prefetched: Dict[str, Any] = None) -> CheckResult:
+        """Vérifie une sonde selon son type (prefetched : résultat DNS déjà obtenu par lot)"""
+        timestamp_ms = self.clock.time_ms()
+        check_start = time.perf_counter()
+        tracer.bind(probe['id'])
+        
+        if self.prober is not None:
+            result = self.prober(probe, timestamp_ms)
+        elif probe['type'] == 'ping':
             result = self.ping_check(
                 probe['target'],
                 probe.get('timeout', 5),
@@ -228,79 +434,65 @@ class MonitoringService:
                 probe['port'],
                 probe.get('timeout', 5)
             )
+        elif probe['type'] == 'dns':
+            result = prefetched if prefetched is not None else self.dns_checks([probe])[0]
         else:
             result = {
                 "status": "error",
                 "error": f"Type de sonde non supporté: {probe['type']}"
             }
         
-        return {
-            "id": probe['id'],
-            "name": probe['name'],
-            "type": probe['type'],
-            "target": probe['target'],
-            "timestamp": timestamp,
-            **result
-        }
-    
-    def has_status_changed(self, probe_id: str, new_status: str) -> bool:
-        """Vérifie si le statut a changé par rapport à la dernière vérification"""
-        if probe_id not in self.previous_status:
-            return True
+        duration = time.perf_counter() - check_start
+        if result.get('response_time_us') is not None:
+            duration = result['response_time_us'] / 1e6
+        metrics.check_duration.observe(probe['type'], value=duration)
+        metrics.checks_total.inc(probe['type'], result['status'])
         
-        return self.previous_status[probe_id] != new_status
+        return CheckResult.from_check(probe, timestamp_ms, result)
+    
+    def current_status_dict(self, probe_id: str) -> Dict[str, Any]:
+        status = self.current_status.get(probe_id)
+        return status.to_dict() if status is not None else {"status": Status.UNKNOWN.value}
     
     def clean_old_history(self):
         """Nettoie l'historique ancien selon la rétention configurée"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=self.history_retention_days)
-            
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('.json'):
-                    try:
-                        file_date_str = filename.replace('.json', '')
-                        file_date = datetime.strptime(file_date_str, '%Y-%m-%d')
-                        
-                        if file_date < cutoff_date:
-                            file_path = os.path.join(self.history_dir, filename)
-                            os.remove(file_path)
-                            logger.info(f"Historique supprimé: {filename}")
-                    except ValueError:
-                        continue
+            cutoff_date = self.clock.now() - timedelta(days=self.history_retention_days)
+            self.history_storage.cleanup(cutoff_date)
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage de l'historique: {e}")
     
+    def append_to_history(self, entries: List[Dict[str, Any]], operation: str):
+        """Ajoute des entrées à l'historique via le backend configuré"""
+        tracer.bind(entries[0].get('id') if len(entries) == 1 else None)
+        with tracer.span('history_write', operation=operation, entries=len(entries),
+                         backend=self.history_storage.name):
+            self.history_storage.append(entries, operation)
+    
     def save_current_status_to_history(self):
         """Sauvegarde le statut actuel de toutes les sondes dans l'historique"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            history_file = os.path.join(self.history_dir, f"{today}.json")
-            
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            else:
-                history = []
-            
-            current_time = datetime.now().isoformat()
-            for probe_id, status in self.current_status.items():
+            entries = []
+            current_ms = self.clock.time_ms()
+            current_time = iso_timestamp(current_ms)
+            for probe_id, status in list(self.current_status.items()):
                 change_type = "periodic_save"
                 if probe_id not in self.previous_status:
                     change_type = "initial"
-                elif self.previous_status[probe_id] != status.get('status'):
+                elif self.previous_status[probe_id] != status.status:
                     change_type = "status_change"
                 
                 history_entry = {
-                    **status,
+                    **status.to_dict(),
                     "timestamp": current_time,
+                    "timestamp_ms": current_ms,
                     "change_type": change_type,
                     "previous_status": self.previous_status.get(probe_id, "unknown")
                 }
                 
-                history.append(history_entry)
+                entries.append(history_entry)
             
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            self.append_to_history(entries, "periodic_save")
             
             logger.info(f"Historique sauvegardé pour {len(self.current_status)} sondes")
             
@@ -310,66 +502,124 @@ class MonitoringService:
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde de l'historique: {e}")
     
-    def save_status_change(self, probe_result: Dict[str, Any], change_type: str):
+    def save_status_change(self, probe_result: CheckResult, change_type: str):
         """Sauvegarde un changement de statut immédiat dans l'historique"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            history_file = os.path.join(self.history_dir, f"{today}.json")
-            
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            else:
-                history = []
-            
             status_change = {
-                **probe_result,
+                **probe_result.to_dict(),
                 "change_type": change_type,
-                "previous_status": self.previous_status.get(probe_result['id'], "unknown")
+                "previous_status": self.previous_status.get(probe_result.id, "unknown")
             }
             
-            history.append(status_change)
-            
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            self.append_to_history([status_change], "status_change")
+            metrics.status_changes_total.inc(change_type)
                 
-            logger.info(f"Changement d'état immédiat sauvegardé pour {probe_result['id']}: {change_type}")
+            logger.info(f"Changement d'état immédiat sauvegardé pour {probe_result.id}: {change_type}")
                 
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du changement: {e}")
     
+    def get_schedule(self, probe: Dict[str, Any], now: float) -> ProbeSchedule:
+        """Retourne (ou crée) l'état de planification d'une sonde"""
+        base_interval = float(probe.get('interval', self.check_interval))
+        schedule = self.schedules.get(probe['id'])
+        if schedule is None:
+            schedule = self.schedules[probe['id']] = ProbeSchedule(base_interval, now)
+        elif schedule.base_interval != base_interval:
+            schedule.base_interval = base_interval
+            schedule.reset(now)
+        return schedule
+    
+    def process_result(self, probe: Dict[str, Any], result: CheckResult, now: float):
+        """Applique la politique adaptative à un résultat et enregistre les transitions confirmées"""
+        probe_id = probe['id']
+        new_status = result.status
+        previous = self.previous_status.get(probe_id)
+        schedule = self.get_schedule(probe, now)
+        was_confirming = schedule.confirming
+        
+        outcome = schedule.on_result(self.adaptive_policy.for_probe(probe), previous, new_status, now)
+        
+        if outcome == "confirming":
+            logger.info(f"⏳ Sonde {probe_id}: {new_status} à confirmer ({schedule.confirming} essai(s) restant(s))")
+            return
+        
+        if outcome == "false_positive":
+            metrics.confirmations_total.inc("false_positive")
+            logger.info(f"↩️  Sonde {probe_id}: échec non confirmé, reste {previous}")
+        elif outcome == "record":
+            change_type = "initial" if previous is None else "status_change"
+            if was_confirming:
+                metrics.confirmations_total.inc("confirmed")
+            self.save_status_change(result, change_type)
+            
+            if change_type == "initial":
+                logger.info(f"🔍 Sonde {probe_id}: état initial = {new_status}")
+            else:
+                logger.info(f"🔄 Sonde {probe_id}: changement {previous} → {new_status}")
+                self.notifier.notify({
+                    "probe_id": probe_id,
+                    "name": probe.get('name'),
+                    "type": probe.get('type'),
+                    "target": probe.get('target'),
+                    "previous_status": previous,
+                    "status": new_status,
+                    "response_time": result.response_time,
+                    "error": result.error,
+                    "timestamp": result.timestamp
+                })
+        
+        self.previous_status[probe_id] = new_status
+        self.current_status[probe_id] = result
+    
+    def run_round(self) -> float:
+        """Un tour du moteur : vérifications échues puis sauvegardes périodiques
+        
+        Renvoie l'échéance suivante (horloge du moteur).
+        """
+        now = self.clock.time()
+        due = [p for p in self.probes if self.get_schedule(p, now).next_check <= now]
+        
+        if due:
+            round_start = time.perf_counter()
+            earliest = min(self.schedules[p['id']].next_check for p in due)
+            metrics.scheduler_lag.set(value=max(0.0, now - earliest))
+            
+            with profiler.round_context():
+                prefetched = self.prefetch_dns(due)
+                for probe in due:
+                    result = self.check_probe(probe, prefetched.get(probe['id']))
+                    self.process_result(probe, result, self.clock.time())
+            
+            metrics.round_duration.observe(value=time.perf_counter() - round_start)
+        
+        current_time = self.clock.time()
+        if current_time - self.last_history_save >= self.history_interval:
+            self.save_current_status_to_history()
+            self.last_history_save = current_time
+        
+        if current_time - self.last_snapshot_save >= self.snapshot_interval:
+            self.save_status_snapshot()
+        
+        # Prochaine échéance (sans dépasser check_interval)
+        next_due = min((self.schedules[p['id']].next_check for p in self.probes
+                        if p['id'] in self.schedules), default=current_time + self.check_interval)
+        return min(next_due, self.last_history_save + self.history_interval,
+                   self.last_snapshot_save + self.snapshot_interval,
+                   current_time + self.check_interval)
+    
     def monitoring_loop(self):
         """Boucle principale de monitoring"""
         while self.monitoring_active:
             try:
-                for probe in self.probes:
-                    result = self.check_probe(probe)
-                    probe_id = probe['id']
-                    new_status = result['status']
-                    
-                    if self.has_status_changed(probe_id, new_status):
-                        change_type = "initial" if probe_id not in self.previous_status else "status_change"
-                        self.save_status_change(result, change_type)
-                        
-                        if change_type == "initial":
-                            logger.info(f"🔍 Sonde {probe_id}: état initial = {new_status}")
-                        else:
-                            previous = self.previous_status.get(probe_id, "unknown")
-                            logger.info(f"🔄 Sonde {probe_id}: changement {previous} → {new_status}")
-                    
-                    self.previous_status[probe_id] = new_status
-                    self.current_status[probe_id] = result
-                
-                current_time = time.time()
-                if current_time - self.last_history_save >= self.history_interval:
-                    self.save_current_status_to_history()
-                    self.last_history_save = current_time
-                
-                time.sleep(self.check_interval)
+                next_due = self.run_round()
+                # Dormir jusqu'à la prochaine échéance
+                self.clock.wait(self.wakeup, max(next_due - self.clock.time(), 0.05))
+                self.wakeup.clear()
                 
             except Exception as e:
                 logger.error(f"Erreur dans la boucle de monitoring: {e}")
-                time.sleep(5)
+                self.clock.sleep(5)
     
     def start_monitoring(self):
         """Démarre le monitoring en arrière-plan"""
@@ -382,49 +632,111 @@ class MonitoringService:
     
     def stop_monitoring(self):
         """Arrête le monitoring"""
+        was_active = self.monitoring_active
         self.monitoring_active = False
+        self.wakeup.set()
+        self.notifier.stop()
+        self.dns.close()
+        self.manual_checks.stop()
+        if was_active:
+            self.save_status_snapshot()
         logger.info("Monitoring arrêté")
     
     def get_history(self, date: str = None, probe_id: str = None) -> List[Dict[str, Any]]:
         """Récupère l'historique pour une date donnée"""
         try:
             if date is None:
-                date = datetime.now().strftime('%Y-%m-%d')
-            
-            history_file = os.path.join(self.history_dir, f"{date}.json")
-            
-            if not os.path.exists(history_file):
-                return []
-            
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            
-            if probe_id:
-                history = [h for h in history if h.get('id') == probe_id]
+                date = self.clock.now().strftime('%Y-%m-%d')
             
-            return history
+            with metrics.history_query_duration.time('day'):
+                return self.history_storage.get_day(date, probe_id)
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'historique: {e}")
             return []
     
-    def get_probe_history_multiday(self, probe_id: str, days: int = 7) -> List[Dict[str, Any]]:
-        """Récupère l'historique d'une sonde sur plusieurs jours"""
+    def history_start(self, days: int) -> datetime:
+        """Début (minuit) de la période couvrant les `days` derniers jours"""
+        today = self.clock.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=days - 1)
+    
+    def get_probe_history_multiday(self, probe_id: str, days: int = 7) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Récupère l'historique d'une sonde sur plusieurs jours
+
+        Renvoie (entrées, jours manquants) : les jours non chargés avant
+        history_query_timeout sont omis et listés.
+        """
         try:
-            all_history = []
-            
-            for i in range(days):
-                date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                daily_history = self.get_history(date, probe_id)
-                all_history.extend(daily_history)
-            
-            all_history.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            
-            return all_history
+            with metrics.history_query_duration.time('multiday'):
+                entries, missing_days = self.history_storage.load_range(
+                    [probe_id], self.history_start(days), timeout=self.history_query_timeout)
+            if missing_days:
+                logger.warning(f"⏱️ Historique de {probe_id} partiel: {len(missing_days)} jour(s) non chargé(s)")
+            return entries[probe_id], missing_days
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'historique multi-jours: {e}")
-            return []
+            return [], []
+    
+    def iter_probe_history(self, probe_id: str, start: datetime, end: datetime = None,
+                           descending: bool = True, cursor: str = None):
+        """Générateur paresseux (clé, entrée) sur une plage, reprise possible via un curseur"""
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            self.history_storage.check_cursor(after)
+        return self.history_storage.iter_range(probe_id, start, end, descending, after)
+    
+    def get_sparklines(self, probe_ids: List[str], start: datetime, end: datetime,
+                       points: int) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Séries de plusieurs sondes, chaque jour d'historique n'étant lu qu'une fois"""
+        entries, missing_days = self.history_storage.load_range(
+            probe_ids, start, end, descending=False, timeout=self.history_query_timeout)
+        if missing_days:
+            logger.warning(f"⏱️ Mini-graphiques partiels: {len(missing_days)} jour(s) non chargé(s)")
+        return {probe_id: self.get_sparkline(probe_id, start, end, points, entries[probe_id])
+                for probe_id in probe_ids}, missing_days
+    
+    def get_sparkline(self, probe_id: str, start: datetime, end: datetime, points: int,
+                      entries: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Séries compactes d'une sonde : statut par intervalle (pire statut) et latence LTTB"""
+        buckets = StatusBuckets(start.timestamp(), end.timestamp(), points)
+        times, latencies = [], []
+        
+        if entries is None:
+            entries = (entry for _, entry in self.history_storage.iter_range(probe_id, start, end, descending=False))
+        for entry in entries:
+            try:
+                if entry.get('timestamp_ms') is not None:
+                    timestamp = entry['timestamp_ms'] / 1000
+                else:
+                    timestamp = datetime.fromisoformat(entry['timestamp']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            buckets.add(timestamp, entry.get('status'))
+            if entry.get('response_time') is not None:
+                times.append(timestamp)
+                latencies.append(entry['response_time'])
+        
+        times, latencies = lttb(times, latencies, points)
+        return {
+            "status": buckets.status,
+            "latency_t": [int(t) for t in times],
+            "latency": [round(v, 2) for v in latencies]
+        }
+    
+    def get_probe_statistics(self, probe_id: str, start: datetime, end: datetime = None,
+                             entries: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Statistiques d'une sonde sur une plage (calculées par le backend si possible)"""
+        try:
+            with metrics.history_query_duration.time('statistics'):
+                if entries is not None and not self.history_storage.native_aggregates:
+                    return self.history_storage.statistics_from(entries)
+                return self.history_storage.statistics(probe_id, start, end)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des statistiques: {e}")
+            return empty_statistics()
     
     def get_status_changes_summary(self, date: str = None) -> Dict[str, Any]:
         """Récupère un résumé des changements d'état pour une date"""
@@ -456,57 +768,179 @@ class MonitoringService:
         
         return summary
 
-# Instance globale du service
-monitoring_service = MonitoringService()
+# Instance globale du service, créée au premier usage : importer ce module
+# (simulation.py, benchmark.py, tests) ne lit ni n'écrit rien dans le projet
+monitoring_service: Optional[MonitoringService] = None
+_monitoring_service_lock = threading.Lock()
+
+def get_monitoring_service() -> MonitoringService:
+    """Instance globale (configuration et historique à la racine du projet)"""
+    global monitoring_service
+    with _monitoring_service_lock:
+        if monitoring_service is None:
+            monitoring_service = MonitoringService(autostart=os.getenv('UPTIMECORE_SIMULATION') != '1')
+        return monitoring_service
+
+def current_service_items(attribute: str) -> list:
+    """Contenu d'un dictionnaire du service global, sans le créer (métriques)"""
+    service = monitoring_service
+    return list(getattr(service, attribute).items()) if service is not None else []
+
+UP_STATUSES = (Status.ONLINE, Status.SLOW)
+
+metrics.probe_up.set_function(lambda: [
+    ((probe_id, status.probe.get('type', 'unknown')), 1 if status.status in UP_STATUSES else 0)
+    for probe_id, status in current_service_items('current_status')
+])
+metrics.probe_check_interval.set_function(lambda: [
+    ((probe_id, ), schedule.interval)
+    for probe_id, schedule in current_service_items('schedules')
+])
+metrics.probe_response_time.set_function(lambda: [
+    ((probe_id, status.probe.get('type', 'unknown')), status.response_time)
+    for probe_id, status in current_service_items('current_status')
+])
+
+def require_admin(view):
+    """Réserve une route aux administrateurs (jeton ADMIN_TOKEN)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = os.getenv('ADMIN_TOKEN')
+        if not expected:
+            return jsonify({"error": "Routes d'administration désactivées (ADMIN_TOKEN non défini)"}), 403
+        
+        provided = request.headers.get('X-Admin-Token', '')
+        authorization = request.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            provided = authorization[len('Bearer '):]
+        
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            return jsonify({"error": "Accès refusé"}), 401
+        return view(*args, **kwargs)
+    return wrapper
 
 # Routes API
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Récupère le statut actuel de toutes les sondes"""
+    service = get_monitoring_service()
+    probes = list(service.current_status.items())
     return jsonify({
-        "timestamp": datetime.now().isoformat(),
-        "probes": monitoring_service.current_status
+        "timestamp": iso_timestamp(service.clock.time_ms()),
+        "stale_probes": sum(1 for _, status in probes if status.stale),
+        "probes": {probe_id: status.to_dict() for probe_id, status in probes}
     })
 
 @app.route('/api/status/<probe_id>', methods=['GET'])
 def get_probe_status(probe_id):
     """Récupère le statut d'une sonde spécifique"""
-    if probe_id in monitoring_service.current_status:
-        return jsonify(monitoring_service.current_status[probe_id])
+    service = get_monitoring_service()
+    if probe_id in service.current_status:
+        return jsonify(service.current_status[probe_id].to_dict())
     else:
         return jsonify({"error": "Sonde non trouvée"}), 404
 
 @app.route('/api/history', methods=['GET'])
 def get_history():
     """Récupère l'historique des changements d'état"""
+    service = get_monitoring_service()
     date = request.args.get('date')
     probe_id = request.args.get('probe_id')
     
-    history = monitoring_service.get_history(date, probe_id)
+    history = service.get_history(date, probe_id)
     
     return jsonify({
-        "date": date or datetime.now().strftime('%Y-%m-%d'),
+        "date": date or service.clock.now().strftime('%Y-%m-%d'),
         "probe_id": probe_id,
         "history": history
     })
 
+RANGE_QUERY_PARAMS = ('from', 'to', 'limit', 'cursor', 'format', 'order')
+# Borne du paramètre days (au-delà, le début de période sortirait des dates représentables)
+MAX_HISTORY_DAYS = 3660
+
+def parse_days_param() -> int:
+    """Paramètre days (7 par défaut) : entier entre 1 et MAX_HISTORY_DAYS"""
+    days = int(request.args.get('days', 7))
+    if not 1 <= days <= MAX_HISTORY_DAYS:
+        raise ValueError(f"days doit être compris entre 1 et {MAX_HISTORY_DAYS}")
+    return days
+
+def parse_time_param(value: str) -> datetime:
+    """Accepte une date (YYYY-MM-DD) ou un horodatage ISO 8601, ramené à l'heure locale"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def get_probe_history_range(probe, probe_info):
+    """Historique par plage [from, to[ avec pagination par curseur, en JSON ou NDJSON"""
+    service = get_monitoring_service()
+    probe_id = probe['id']
+    try:
+        end = parse_time_param(request.args['to']) if request.args.get('to') else None
+        if request.args.get('from'):
+            start = parse_time_param(request.args['from'])
+        else:
+            start = service.history_start(parse_days_param())
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        if limit is not None and limit <= 0:
+            raise ValueError("limit doit être positif")
+        descending = request.args.get('order', 'desc') != 'asc'
+        rows = service.iter_probe_history(
+            probe_id, start, end, descending, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": f"Paramètre invalide: {e}"}), 400
+    
+    streaming = (request.args.get('format') == 'ndjson'
+                 or request.accept_mimetypes.best == 'application/x-ndjson')
+    
+    if streaming:
+        def generate():
+            # Une entrée par ligne ; si la limite est atteinte et qu'il reste des
+            # entrées, une dernière ligne {"next_cursor": ...} permet de reprendre.
+            query_start = time.perf_counter()
+            count, last_key = 0, None
+            try:
+                for key, entry in rows:
+                    if limit is not None and count >= limit:
+                        yield json.dumps({"next_cursor": encode_cursor(last_key)}) + '\n'
+                        break
+                    yield json.dumps(entry, ensure_ascii=False) + '\n'
+                    count, last_key = count + 1, key
+            finally:
+                metrics.history_query_duration.observe('stream', value=time.perf_counter() - query_start)
+        
+        return Response(stream_with_context(generate()), content_type='application/x-ndjson; charset=utf-8')
+    
+    history, next_cursor = [], None
+    with metrics.history_query_duration.time('range'):
+        last_key = None
+        for key, entry in rows:
+            if limit is not None and len(history) >= limit:
+                next_cursor = encode_cursor(last_key)
+                break
+            history.append(entry)
+            last_key = key
+    
+    return jsonify({
+        "probe": probe_info,
+        "from": start.isoformat(),
+        "to": end.isoformat() if end else None,
+        "order": "desc" if descending else "asc",
+        "current_status": service.current_status_dict(probe_id),
+        "history": history,
+        "next_cursor": next_cursor
+    })
+
 @app.route('/api/history/<probe_id>', methods=['GET'])
 def get_probe_history(probe_id):
     """Récupère l'historique d'une sonde spécifique sur plusieurs jours"""
-    probe = next((p for p in monitoring_service.probes if p['id'] == probe_id), None)
+    service = get_monitoring_service()
+    probe = next((p for p in service.probes if p['id'] == probe_id), None)
     if not probe:
         return jsonify({"error": "Sonde non trouvée"}), 404
     
-    days = int(request.args.get('days', 7))
-    date = request.args.get('date')
-    
-    if date:
-        history = monitoring_service.get_history(date, probe_id)
-        response_date = date
-    else:
-        history = monitoring_service.get_probe_history_multiday(probe_id, days)
-        response_date = f"{days} derniers jours"
-    
     probe_info = {
         "id": probe['id'],
         "name": probe['name'],
@@ -514,81 +948,249 @@ def get_probe_history(probe_id):
         "target": probe['target']
     }
     
-    stats = {
-        "total_entries": len(history),
-        "status_distribution": {},
-        "change_types": {"initial": 0, "status_change": 0, "periodic_save": 0}
-    }
+    if any(param in request.args for param in RANGE_QUERY_PARAMS):
+        return get_probe_history_range(probe, probe_info)
     
-    for entry in history:
-        status = entry.get('status', 'unknown')
-        change_type = entry.get('change_type', 'unknown')
-        
-        if status not in stats["status_distribution"]:
-            stats["status_distribution"][status] = 0
-        stats["status_distribution"][status] += 1
-        
-        if change_type in stats["change_types"]:
-            stats["change_types"][change_type] += 1
+    date = request.args.get('date')
+    try:
+        days = parse_days_param()
+        if date:
+            start = datetime.strptime(date, '%Y-%m-%d')
+    except ValueError as e:
+        return jsonify({"error": f"Paramètre invalide: {e}"}), 400
     
-    return jsonify({
+    if date:
+        end = start + timedelta(days=1)
+        history = service.get_history(date, probe_id)
+        response_date = date
+    else:
+        history, missing_days = service.get_probe_history_multiday(probe_id, days)
+        response_date = f"{days} derniers jours"
+        start, end = service.history_start(days), None
+    
+    stats = service.get_probe_statistics(probe_id, start, end, history)
+    
+    response = {
         "probe": probe_info,
         "period": response_date,
-        "current_status": monitoring_service.current_status.get(probe_id, {"status": "unknown"}),
+        "current_status": service.current_status_dict(probe_id),
         "statistics": stats,
         "history": history
+    }
+    if not date:
+        response["partial"] = bool(missing_days)
+        response["missing_days"] = missing_days
+    return jsonify(response)
+
+@app.route('/api/sparklines', methods=['GET'])
+def get_sparklines():
+    """Séries sous-échantillonnées pour les mini-graphiques du dashboard (taille fixe)"""
+    service = get_monitoring_service()
+    try:
+        points = min(max(int(request.args.get('points', 100)), 3), 1000)
+        end = parse_time_param(request.args['to']) if request.args.get('to') else service.clock.now()
+        if request.args.get('from'):
+            start = parse_time_param(request.args['from'])
+        else:
+            start = end - timedelta(hours=float(request.args.get('hours', 24)))
+        if start >= end:
+            raise ValueError("from doit précéder to")
+    except (ValueError, OverflowError) as e:
+        return jsonify({"error": f"Paramètre invalide: {e}"}), 400
+    
+    known_ids = [p['id'] for p in service.probes]
+    probe_ids = [p for p in request.args.getlist('probe_id') if p in known_ids] or known_ids
+    
+    with metrics.history_query_duration.time('sparkline'):
+        series, missing_days = service.get_sparklines(probe_ids, start, end, points)
+    
+    return jsonify({
+        "from": int(start.timestamp()),
+        "to": int(end.timestamp()),
+        "points": points,
+        "bucket_seconds": (end - start).total_seconds() / points,
+        "partial": bool(missing_days),
+        "missing_days": missing_days,
+        "probes": series
     })
 
 @app.route('/api/history/summary', methods=['GET'])
 def get_history_summary():
     """Récupère un résumé des changements d'état"""
+    service = get_monitoring_service()
     date = request.args.get('date')
-    summary = monitoring_service.get_status_changes_summary(date)
+    summary = service.get_status_changes_summary(date)
     
     return jsonify({
-        "date": date or datetime.now().strftime('%Y-%m-%d'),
+        "date": date or service.clock.now().strftime('%Y-%m-%d'),
         "summary": summary
     })
 
 @app.route('/api/probes', methods=['GET'])
 def get_probes():
     """Récupère la liste des sondes configurées"""
+    service = get_monitoring_service()
     return jsonify({
-        "probes": monitoring_service.probes
+        "probes": service.probes
     })
 
+def job_to_dict(job: Dict[str, Any]) -> Dict[str, Any]:
+    if job.get('result') is not None:
+        return {**job, "result": job['result'].to_dict()}
+    return job
+
 @app.route('/api/check/<probe_id>', methods=['POST'])
 def manual_check(probe_id):
-    """Effectue une vérification manuelle d'une sonde"""
-    probe = next((p for p in monitoring_service.probes if p['id'] == probe_id), None)
+    """Effectue une vérification manuelle d'une sonde (?async=1 : renvoie une tâche)"""
+    service = get_monitoring_service()
+    probe = next((p for p in service.probes if p['id'] == probe_id), None)
     
     if not probe:
         return jsonify({"error": "Sonde non trouvée"}), 404
     
-    result = monitoring_service.check_probe(probe)
-    return jsonify(result)
+    try:
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            job = job_to_dict(service.manual_checks.submit(probe))
+            response = jsonify(job)
+            response.status_code = 200 if job['status'] == 'done' else 202
+            response.headers['Location'] = f"/api/check/jobs/{job['job_id']}"
+            return response
+        
+        result, source = service.manual_checks.run(probe)
+        result = result.to_dict()
+    except RateLimited as e:
+        response = jsonify({"error": str(e), "retry_after": round(e.retry_after, 1)})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+        return response
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+    
+    response = jsonify(result)
+    response.headers['X-Check-Source'] = source
+    return response
+
+@app.route('/api/check/jobs/<job_id>', methods=['GET'])
+def manual_check_job(job_id):
+    """État d'une vérification manuelle asynchrone"""
+    service = get_monitoring_service()
+    job = service.manual_checks.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue ou expirée"}), 404
+    return jsonify(job_to_dict(job))
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Point de santé de l'API"""
+    service = get_monitoring_service()
     return jsonify({
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "monitoring_active": monitoring_service.monitoring_active,
-        "probes_count": len(monitoring_service.probes),
-        "history_interval": monitoring_service.history_interval
+        "timestamp": iso_timestamp(service.clock.time_ms()),
+        "monitoring_active": service.monitoring_active,
+        "probes_count": len(service.probes),
+        "history_interval": service.history_interval
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose les métriques au format texte Prometheus"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/admin/profile/start', methods=['POST'])
+@require_admin
+def start_profiling():
+    """Démarre une session de profilage pour N secondes"""
+    params = request.get_json(silent=True) or {}
+    try:
+        duration = min(float(params.get('seconds', request.args.get('seconds', 30))), 600)
+        interval = max(float(params.get('interval_ms', request.args.get('interval_ms', 10))), 1) / 1000
+        mode = params.get('mode', request.args.get('mode', 'sample'))
+        session = profiler.start(mode, duration, interval)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    logger.info(f"Profilage démarré: mode={mode}, durée={duration}s")
+    return jsonify({"profile": session.describe()})
+
+@app.route('/api/admin/profile/stop', methods=['POST'])
+@require_admin
+def stop_profiling():
+    """Arrête la session de profilage en cours"""
+    session = profiler.stop()
+    if session is None:
+        return jsonify({"error": "Aucune session de profilage"}), 404
+    return jsonify({"profile": session.describe()})
+
+@app.route('/api/admin/profile', methods=['GET'])
+@require_admin
+def get_profiling_result():
+    """Télécharge le résultat de la dernière session de profilage"""
+    session = profiler.session
+    if session is None:
+        return jsonify({"error": "Aucune session de profilage"}), 404
+    
+    extension = 'folded' if session.mode == 'sample' else 'txt'
+    filename = f"profile_{datetime.fromtimestamp(session.started_at).strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        session.result(),
+        content_type='text/plain; charset=utf-8',
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Profile-Active": str(session.active).lower()
+        }
+    )
+
+@app.route('/api/admin/trace', methods=['GET', 'POST'])
+@require_admin
+def trace_spans():
+    """Active/désactive les traces (POST) ou renvoie les spans enregistrés (GET)"""
+    if request.method == 'POST':
+        params = request.get_json(silent=True) or {}
+        capacity = params.get('capacity')
+        try:
+            if capacity is not None:
+                capacity = int(capacity)
+                if capacity <= 0:
+                    raise ValueError("capacity doit être un entier positif")
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Paramètre invalide: {e}"}), 400
+        tracer.configure(bool(params.get('enabled', True)), capacity)
+        logger.info(f"Traces {'activées' if tracer.enabled else 'désactivées'}")
+    
+    limit = request.args.get('limit', type=int)
+    return jsonify({
+        "enabled": tracer.enabled,
+        "capacity": tracer.spans.maxlen,
+        "spans": tracer.export(request.args.get('probe_id'), limit) if request.method == 'GET' else []
     })
 
 @app.route('/api/reload', methods=['POST'])
 def reload_config():
     """Recharge la configuration"""
+    service = get_monitoring_service()
     try:
-        monitoring_service.load_config()
+        service.load_config()
         return jsonify({"message": "Configuration rechargée avec succès"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def notify_ready():
+    """Signale au launcher (descripteur hérité UPTIMECORE_READY_FD) que l'API écoute"""
+    ready_fd = os.getenv('UPTIMECORE_READY_FD')
+    if not ready_fd:
+        return
+    try:
+        fd = int(ready_fd)
+        os.write(fd, f"READY {os.getpid()}\n".encode())
+        os.close(fd)
+    except (ValueError, OSError) as e:
+        logger.warning(f"Impossible de signaler la disponibilité au launcher: {e}")
+
 if __name__ == '__main__':
+    # Création (et démarrage) du service global avant d'ouvrir le socket
+    get_monitoring_service()
     try:
         print("🚀 Démarrage de l'API de monitoring...")
         print(f"📁 Fichier de configuration: {os.path.abspath(monitoring_service.config_file)}")
@@ -602,15 +1204,27 @@ if __name__ == '__main__':
         print("   GET  /api/status/<probe_id> - Statut d'une sonde")
         print("   GET  /api/history - Historique complet")
         print("   GET  /api/history/<probe_id> - Historique d'une sonde")
+        print("        ?from=&to=&limit=&cursor=&order=&format=ndjson - Plage paginée / streaming")
         print("   GET  /api/history/summary - Résumé de l'historique")
+        print("   GET  /api/sparklines - Séries sous-échantillonnées (mini-graphiques)")
         print("   GET  /api/probes - Liste des sondes")
         print("   POST /api/check/<probe_id> - Vérification manuelle")
         print("   POST /api/reload - Recharger la configuration")
+        print("   GET  /metrics - Métriques Prometheus")
+        print("   POST /api/admin/profile/start|stop - Profilage (admin)")
+        print("   GET  /api/admin/profile - Résultat du profilage (admin)")
+        print("   GET|POST /api/admin/trace - Traces par vérification (admin)")
         print()
         
-        app.run(debug=False, host='0.0.0.0', port=5000)
+        # Le socket est ouvert avant de signaler la disponibilité au launcher
+        server = make_server('0.0.0.0', 5000, app, threaded=True)
+        notify_ready()
+        
+        # Arrêt propre sur SIGTERM (envoyé par le launcher) pour écrire l'instantané
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        server.serve_forever()
         
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, SystemExit):
         print("\n🛑 Arrêt du monitoring...")
         monitoring_service.stop_monitoring()
     except Exception as e:
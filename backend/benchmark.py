@@ -0,0 +1,217 @@
+"""Mesures reproductibles du moteur, sur une simulation (voir simulation.py).
+
+Une simulation (sondes générées, graine et date de début fixes) remplit
+l'historique, en chronométrant chaque écriture. Les requêtes d'historique
+de l'API sont ensuite mesurées sur le résultat : plusieurs jours, page
+de plage avec curseur, mini-graphiques, statistiques. À paramètres
+égaux, deux exécutions travaillent sur exactement les mêmes données.
+
+Le coût du logging est mesuré de deux façons : durée d'un appel de log
+vu du thread appelant (écriture directe dans le fichier ou file
+d'attente de log_config), et même simulation rejouée avec les logs INFO
+du moteur écrits dans un fichier, comparée à une exécution sans logs.
+
+Exemple :
+    python benchmark.py --probes 200 --days 7 --history-backend sqlite
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+import log_config
+from history_storage import encode_cursor
+from results import parse_timestamp_ms
+from simulation import ScriptedOutcomes, Simulation, create_service, generate_config
+
+DEFAULT_START = '2026-01-05T00:00:00'
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Durées en secondes -> min, médiane et p95 en millisecondes"""
+    ordered = sorted(durations)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3)
+    }
+
+
+def measure(operation: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def bench_history_writes(service, clock, outcomes: ScriptedOutcomes, end: float) -> Dict[str, Any]:
+    """Simulation complète ; chaque écriture d'historique est chronométrée"""
+    durations = []
+    append = service.append_to_history
+
+    def timed_append(entries, operation):
+        started = time.perf_counter()
+        append(entries, operation)
+        durations.append(time.perf_counter() - started)
+
+    service.append_to_history = timed_append
+    report = Simulation(service, clock, outcomes).run(end, progress_every=float('inf'))
+    report["writes"] = summarize(durations) if durations else {"runs": 0}
+    report["write_seconds"] = round(sum(durations), 3)
+    return report
+
+
+def bench_history_queries(service, days: int, repeats: int) -> Dict[str, Any]:
+    """Requêtes d'historique telles que les font les routes de l'API"""
+    probe_ids = [probe['id'] for probe in service.probes]
+    probe_id = probe_ids[0]
+    end = service.clock.now()
+    start = service.history_start(days)
+    last_day = end - timedelta(hours=24)
+
+    def range_pages():
+        keys = [key for key, _ in islice(service.iter_probe_history(probe_id, start, end), 100)]
+        if keys:
+            list(islice(service.iter_probe_history(probe_id, start, end, cursor=encode_cursor(keys[-1])), 100))
+
+    return {
+        "multiday": measure(lambda: service.get_probe_history_multiday(probe_id, days), repeats),
+        "range_pages": measure(range_pages, repeats),
+        "statistics": measure(lambda: service.get_probe_statistics(probe_id, start), repeats),
+        "sparklines_24h": measure(lambda: service.get_sparklines(probe_ids, last_day, end, 100), repeats)
+    }
+
+
+def bench_log_calls(directory: str, messages: int, batch: int = 1000) -> Dict[str, Any]:
+    """Durée d'un appel logger.info() vu de l'appelant : handler direct ou file d'attente"""
+    logger = logging.getLogger('benchmark.logging')
+    logger.propagate = False
+    results = {}
+
+    def emit():
+        for index in range(batch):
+            logger.info(f"🔍 Sonde sim_{index:04d}: online -> offline (message de mesure)")
+
+    for mode in ('direct', 'queued'):
+        handler = log_config.make_file_handler(os.path.join(directory, f"{mode}.log"))
+        listener = None
+        if mode == 'queued':
+            listener = log_config.attach_queue(logger, [handler])
+        else:
+            logger.handlers = [handler]
+            logger.setLevel(logging.INFO)
+
+        timings = measure(emit, max(1, messages // batch))
+        started = time.perf_counter()
+        if listener is not None:
+            log_config.detach_queue(logger, listener)  # attend l'écriture des messages en file
+        drain = time.perf_counter() - started
+        handler.close()
+        logger.handlers = []
+
+        results[mode] = {
+            "messages": timings["runs"] * batch,
+            "per_call_us_median": round(timings["median_ms"] * 1000 / batch, 3),
+            "per_call_us_p95": round(timings["p95_ms"] * 1000 / batch, 3),
+            "drain_ms": round(drain * 1000, 3)
+        }
+    return results
+
+
+def bench_engine_logging(directory: str, config: Dict[str, Any], start: float, end: float,
+                         args: argparse.Namespace) -> Dict[str, Any]:
+    """Même simulation sans logs puis avec les logs INFO du moteur dans un fichier"""
+    results = {}
+    root = logging.getLogger()
+    for mode in ('off', 'info'):
+        output = os.path.join(directory, f"engine-{mode}")
+        listener = None
+        if mode == 'info':
+            previous_handlers = root.handlers
+            listener = log_config.configure_logging(os.path.join(output, 'engine.log'), console=None)
+        else:
+            root.setLevel(logging.WARNING)
+
+        try:
+            service, clock = create_service(output, config, start, args.interval, args.history_interval)
+            report = Simulation(service, clock, ScriptedOutcomes(args.seed)).run(end, progress_every=float('inf'))
+            service.history_storage.close()
+            service.notifier.stop()
+            service.manual_checks.stop()
+        finally:
+            if listener is not None:
+                log_config.detach_queue(root, listener)  # attend l'écriture des messages en file
+                for handler in listener.handlers:
+                    handler.close()
+                root.handlers = previous_handlers
+                root.setLevel(logging.WARNING)
+        log_file = os.path.join(output, 'engine.log')
+        results[mode] = {
+            "elapsed_seconds": report["elapsed_seconds"],
+            "checks": report["checks"],
+            "log_bytes": os.path.getsize(log_file) if os.path.exists(log_file) else 0
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures reproductibles sur une simulation du moteur")
+    parser.add_argument('--output', help="Dossier de la simulation (défaut : dossier temporaire supprimé ensuite)")
+    parser.add_argument('--probes', type=int, default=100)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--start', default=DEFAULT_START, help="Début ISO 8601 de la simulation")
+    parser.add_argument('--interval', type=float, default=300, help="Intervalle de vérification (s)")
+    parser.add_argument('--history-interval', type=float, default=3600, help="Intervalle des sauvegardes périodiques (s)")
+    parser.add_argument('--history-backend', default='sqlite', choices=('json', 'sqlite'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=20, help="Répétitions par requête mesurée")
+    parser.add_argument('--log-messages', type=int, default=20000, help="Appels de log mesurés par mode")
+    parser.add_argument('--logging-days', type=float, default=1, help="Durée de la simulation rejouée avec logs (jours)")
+    parser.add_argument('--report', help="Fichier JSON où écrire le rapport")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    output = args.output or tempfile.mkdtemp(prefix='uptimecore-bench-')
+    try:
+        start = parse_timestamp_ms(args.start) / 1000
+        config = generate_config(args.probes, args.interval, args.history_backend)
+        service, clock = create_service(output, config, start, args.interval, args.history_interval)
+        outcomes = ScriptedOutcomes(args.seed)
+
+        print(f"⏱️ Benchmark: {len(service.probes)} sondes, {args.days} jours simulés "
+              f"(backend {service.history_storage.name})")
+        report = {
+            "parameters": {k: v for k, v in vars(args).items() if k not in ('output', 'report')},
+            "history_writes": bench_history_writes(service, clock, outcomes, start + args.days * 86400),
+            "history_queries": bench_history_queries(service, args.days, args.repeats)
+        }
+        service.history_storage.close()
+        service.notifier.stop()
+        service.manual_checks.stop()
+
+        report["log_calls"] = bench_log_calls(output, args.log_messages)
+        report["engine_logging"] = bench_engine_logging(output, config, start,
+                                                        start + args.logging_days * 86400, args)
+    finally:
+        if not args.output:
+            shutil.rmtree(output, ignore_errors=True)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Horloge injectable du moteur de monitoring.
+
+Le moteur (planification, historique, rétention, instantané) lit l'heure
+et attend uniquement via un objet Clock. En production c'est l'horloge
+système ; en simulation (voir simulation.py), SimulatedClock avance d'un
+coup jusqu'à la prochaine échéance au lieu d'attendre.
+
+Les mesures de durée réelles (temps de réponse, durée d'un tour) restent
+faites avec time.perf_counter().
+"""
+import threading
+import time
+from datetime import datetime
+
+
+class Clock:
+    """Horloge système"""
+
+    def time(self) -> float:
+        return time.time()
+
+    def time_ms(self) -> int:
+        return time.time_ns() // 1_000_000
+
+    def now(self) -> datetime:
+        """Heure locale naïve, comme datetime.now()"""
+        return datetime.now()
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout)
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    """Horloge pilotée : le temps n'avance que sur demande"""
+
+    def __init__(self, start: float):
+        self.current = start
+
+    def time(self) -> float:
+        return self.current
+
+    def time_ms(self) -> int:
+        return int(self.current * 1000)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.current)
+
+    def advance(self, seconds: float):
+        self.current += max(seconds, 0.0)
+
+    def advance_to(self, timestamp: float):
+        self.current = max(self.current, timestamp)
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        if not event.is_set():
+            self.advance(timeout)
+        return event.is_set()
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+
+SYSTEM_CLOCK = Clock()
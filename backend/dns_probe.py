@@ -0,0 +1,318 @@
+"""Requêtes DNS multiplexées sur une socket UDP non bloquante.
+
+Toutes les requêtes d'un tour de vérification partent d'un coup sur la
+même socket (une par famille d'adresses) ; les réponses sont ensuite
+associées à leur requête par identifiant de transaction, serveur et
+question. La latence est mesurée en microsecondes (perf_counter_ns).
+"""
+import ipaddress
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+RECORD_TYPES = {
+    "A": 1,
+    "NS": 2,
+    "CNAME": 5,
+    "SOA": 6,
+    "PTR": 12,
+    "MX": 15,
+    "TXT": 16,
+    "AAAA": 28,
+    "SRV": 33
+}
+RECORD_NAMES = {value: name for name, value in RECORD_TYPES.items()}
+
+RCODES = {
+    0: "NOERROR",
+    1: "FORMERR",
+    2: "SERVFAIL",
+    3: "NXDOMAIN",
+    4: "NOTIMP",
+    5: "REFUSED"
+}
+
+HEADER = struct.Struct('!HHHHHH')
+FLAG_RESPONSE = 0x8000
+FLAG_TRUNCATED = 0x0200
+FLAG_RECURSION_DESIRED = 0x0100
+CLASS_IN = 1
+MAX_DATAGRAM = 4096
+RECEIVE_BUFFER = 1024 * 1024
+
+
+def encode_labels(name: str) -> List[bytes]:
+    """Labels au format du réseau (IDNA : bücher -> xn--bcher-kva)"""
+    labels = []
+    for label in name.rstrip('.').split('.'):
+        if not label:
+            continue
+        raw = label.encode('idna')
+        if len(raw) > 63:
+            raise ValueError(f"Label DNS trop long: {label}")
+        labels.append(raw)
+    return labels
+
+
+def encode_name(name: str) -> bytes:
+    return b''.join(bytes([len(raw)]) + raw for raw in encode_labels(name)) + b'\x00'
+
+
+def wire_name(name: str) -> str:
+    """Nom tel que read_name() le décode dans une réponse"""
+    return b'.'.join(encode_labels(name)).decode('ascii').lower()
+
+
+def build_query(txid: int, name: str, record_type: int) -> bytes:
+    header = HEADER.pack(txid, FLAG_RECURSION_DESIRED, 1, 0, 0, 0)
+    return header + encode_name(name) + struct.pack('!HH', record_type, CLASS_IN)
+
+
+def read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Lit un nom (pointeurs de compression compris), renvoie (nom, offset suivant)"""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if jumps > 32:
+                raise ValueError("Boucle de compression DNS")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+        elif length == 0:
+            offset += 1
+            break
+        else:
+            labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+            offset += 1 + length
+    return '.'.join(labels).lower(), end if end is not None else offset
+
+
+def decode_rdata(data: bytes, offset: int, length: int, record_type: int) -> str:
+    rdata = data[offset:offset + length]
+    if record_type == RECORD_TYPES["A"]:
+        return socket.inet_ntop(socket.AF_INET, rdata)
+    if record_type == RECORD_TYPES["AAAA"]:
+        return socket.inet_ntop(socket.AF_INET6, rdata)
+    if record_type in (RECORD_TYPES["CNAME"], RECORD_TYPES["NS"], RECORD_TYPES["PTR"]):
+        return read_name(data, offset)[0]
+    if record_type == RECORD_TYPES["MX"]:
+        preference = struct.unpack('!H', rdata[:2])[0]
+        return f"{preference} {read_name(data, offset + 2)[0]}"
+    if record_type == RECORD_TYPES["TXT"]:
+        parts, position = [], 0
+        while position < len(rdata):
+            size = rdata[position]
+            parts.append(rdata[position + 1:position + 1 + size].decode('utf-8', 'replace'))
+            position += 1 + size
+        return ''.join(parts)
+    return rdata.hex()
+
+
+def parse_response(data: bytes) -> Dict[str, Any]:
+    """Décode l'en-tête, la question et les enregistrements de la section réponse"""
+    txid, flags, qdcount, ancount, _, _ = HEADER.unpack_from(data)
+    offset = HEADER.size
+    question = None
+    for _ in range(qdcount):
+        name, offset = read_name(data, offset)
+        qtype, _ = struct.unpack_from('!HH', data, offset)
+        offset += 4
+        question = question or (name, qtype)
+
+    answers = []
+    for _ in range(ancount):
+        _, offset = read_name(data, offset)
+        rtype, _, _, length = struct.unpack_from('!HHIH', data, offset)
+        offset += 10
+        answers.append({
+            "type": RECORD_NAMES.get(rtype, str(rtype)),
+            "value": decode_rdata(data, offset, length, rtype)
+        })
+        offset += length
+
+    return {
+        "txid": txid,
+        "is_response": bool(flags & FLAG_RESPONSE),
+        "truncated": bool(flags & FLAG_TRUNCATED),
+        "rcode": RCODES.get(flags & 0x000F, str(flags & 0x000F)),
+        "question": question,
+        "answers": answers
+    }
+
+
+def parse_server(target: str, port: int = 53) -> Tuple[str, int]:
+    """'1.1.1.1', '1.1.1.1:5353', '::1' ou '[::1]:5353' -> (hôte, port)"""
+    if target.startswith('['):
+        host, _, rest = target[1:].partition(']')
+        return host, int(rest[1:]) if rest.startswith(':') else port
+    if target.count(':') == 1:
+        host, _, port_text = target.partition(':')
+        return host, int(port_text)
+    return target, port
+
+
+def resolve_server(host: str, port: int) -> Tuple[int, Tuple]:
+    try:
+        address = ipaddress.ip_address(host)
+        family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+        return family, (str(address), port) if family == socket.AF_INET else (str(address), port, 0, 0)
+    except ValueError:
+        family, _, _, _, sockaddr = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+        return family, sockaddr
+
+
+class DnsMultiplexer:
+    """Envoie un lot de requêtes sur une socket partagée et attend toutes les réponses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sockets: Dict[int, socket.socket] = {}
+
+    def _socket(self, family: int) -> socket.socket:
+        sock = self._sockets.get(family)
+        if sock is None:
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            except OSError:
+                pass
+            sock.bind(('::' if family == socket.AF_INET6 else '0.0.0.0', 0))
+            self._sockets[family] = sock
+        return sock
+
+    @staticmethod
+    def _drain(sock: socket.socket):
+        # Réponses tardives d'un lot précédent (requêtes déjà expirées)
+        while True:
+            try:
+                sock.recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+    def query_many(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chaque requête : {name, record_type, server, port, timeout}
+
+        Renvoie, dans le même ordre, {rcode, answers, latency_us, error}.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        if not queries:
+            return []
+
+        with self._lock:
+            pending: Dict[Tuple[int, int], Dict[str, Any]] = {}
+            used_ids = set()
+            selector = selectors.DefaultSelector()
+            try:
+                for index, query in enumerate(queries):
+                    record_type = RECORD_TYPES.get(str(query.get('record_type', 'A')).upper())
+                    if record_type is None:
+                        results[index] = {"error": f"Type d'enregistrement non supporté: {query.get('record_type')}"}
+                        continue
+
+                    if len(used_ids) > 0xFFFF:
+                        results[index] = {"error": "Trop de requêtes simultanées"}
+                        continue
+
+                    try:
+                        family, address = resolve_server(query['server'], query.get('port', 53))
+                        sock = self._socket(family)
+                        if family not in self._registered(selector):
+                            self._drain(sock)
+                            selector.register(sock, selectors.EVENT_READ, family)
+
+                        txid = random.getrandbits(16)
+                        while txid in used_ids:
+                            txid = random.getrandbits(16)
+                        used_ids.add(txid)
+
+                        packet = build_query(txid, query['name'], record_type)
+                        question = (wire_name(query['name']), record_type)
+                    except (OSError, ValueError, UnicodeError) as e:
+                        results[index] = {"error": f"Envoi impossible: {e}"}
+                        continue
+
+                    sent_ns = time.perf_counter_ns()
+                    try:
+                        sock.sendto(packet, address)
+                    except OSError as e:
+                        results[index] = {"error": f"Envoi impossible: {e}"}
+                        continue
+
+                    pending[(family, txid)] = {
+                        "index": index,
+                        "address": address[:2],
+                        "question": question,
+                        "sent_ns": sent_ns,
+                        "deadline_ns": sent_ns + int(query.get('timeout', 5) * 1e9)
+                    }
+                    # Lire au fil de l'envoi pour ne pas saturer le tampon de réception
+                    self._receive(sock, family, pending, results)
+
+                while pending:
+                    now_ns = time.perf_counter_ns()
+                    for key in [k for k, p in pending.items() if p['deadline_ns'] <= now_ns]:
+                        results[pending.pop(key)['index']] = {"error": "Timeout"}
+                    if not pending:
+                        break
+
+                    wait = (min(p['deadline_ns'] for p in pending.values()) - now_ns) / 1e9
+                    for key, _ in selector.select(max(wait, 0)):
+                        self._receive(key.fileobj, key.data, pending, results)
+            finally:
+                selector.close()
+
+        return results
+
+    @staticmethod
+    def _registered(selector: selectors.BaseSelector) -> set:
+        return {key.data for key in selector.get_map().values()}
+
+    @staticmethod
+    def _receive(sock: socket.socket, family: int, pending: Dict, results: List):
+        while True:
+            try:
+                data, address = sock.recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # ICMP port unreachable remonté par certains systèmes : ignoré ici,
+                # la requête concernée finira en timeout
+                return
+            received_ns = time.perf_counter_ns()
+
+            try:
+                response = parse_response(data)
+            except Exception:
+                continue
+
+            entry = pending.get((family, response['txid']))
+            # Identifiant, serveur et question doivent correspondre (réponses usurpées ignorées)
+            if (entry is None or not response['is_response'] or address[:2] != entry['address']
+                    or response['question'] != entry['question']):
+                continue
+
+            del pending[(family, response['txid'])]
+            results[entry['index']] = {
+                "rcode": response['rcode'],
+                "answers": response['answers'],
+                "truncated": response['truncated'],
+                "latency_us": (received_ns - entry['sent_ns']) // 1000,
+                "error": None
+            }
+
+    def close(self):
+        with self._lock:
+            for sock in self._sockets.values():
+                sock.close()
+            self._sockets.clear()
@@ -0,0 +1,77 @@
+"""Sous-échantillonnage des séries d'historique pour les mini-graphiques.
+
+- temps de réponse : Largest-Triangle-Three-Buckets (LTTB), qui conserve la
+  forme de la courbe (pics compris) avec un nombre de points fixe ;
+- statut : découpage en intervalles réguliers, le pire statut l'emporte.
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+# Du meilleur au pire : c'est le plus grave qui est retenu dans un intervalle
+STATUS_SEVERITY = {
+    "online": 0,
+    "slow": 1,
+    "timeout": 2,
+    "error": 3,
+    "offline": 4
+}
+UNKNOWN_SEVERITY = 2
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """Réduit la série (xs, ys), triée par xs, à `threshold` points"""
+    length = len(xs)
+    if threshold >= length or threshold < 3:
+        return list(xs), list(ys)
+
+    sampled_x, sampled_y = [xs[0]], [ys[0]]
+    bucket_size = (length - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Moyenne de l'intervalle suivant (3e sommet du triangle)
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, length)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # Point de l'intervalle courant formant le plus grand triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area, best = -1.0, start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best = area, j
+
+        sampled_x.append(xs[best])
+        sampled_y.append(ys[best])
+        a = best
+
+    sampled_x.append(xs[-1])
+    sampled_y.append(ys[-1])
+    return sampled_x, sampled_y
+
+
+class StatusBuckets:
+    """Intervalles réguliers sur [start, end[ alimentés au fil de l'eau"""
+
+    def __init__(self, start: float, end: float, count: int):
+        self.start = start
+        self.count = count
+        self.width = (end - start) / count
+        self.severity: List[Optional[int]] = [None] * count
+        self.status: List[Optional[str]] = [None] * count
+
+    def add(self, timestamp: float, status: str):
+        # floor et non int() : juste avant `start`, int() arrondirait vers l'intervalle 0
+        index = math.floor((timestamp - self.start) / self.width)
+        if not 0 <= index < self.count:
+            return
+        severity = STATUS_SEVERITY.get(status, UNKNOWN_SEVERITY)
+        current = self.severity[index]
+        if current is None or severity > current:
+            self.severity[index] = severity
+            self.status[index] = status
@@ -0,0 +1,518 @@
+"""Stockage de l'historique des sondes.
+
+Deux backends interchangeables :
+- ``json`` : un fichier JSON par jour (format historique, par défaut) ;
+- ``sqlite`` : une base SQLite en mode WAL, insertions groupées en
+  transaction et index (probe_id, timestamp) pour que les requêtes par
+  plage, les comptages et les agrégats soient faits par la base.
+
+Les entrées portent un horodatage ISO 8601 local (avec décalage) et, depuis
+les résultats compacts, timestamp_ms (epoch en millisecondes) : le backend
+JSON filtre et trie sur cet entier (les anciennes entrées sans ce champ
+sont converties à la lecture). Les lectures par plage sont des générateurs : les
+entrées sont produites déjà ordonnées, jour après jour (ou curseur SQL),
+sans tout charger en mémoire ni trier globalement.
+"""
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import metrics
+from clock import SYSTEM_CLOCK, Clock
+from results import parse_timestamp_ms
+
+logger = logging.getLogger(__name__)
+
+
+def empty_statistics() -> Dict[str, Any]:
+    return {
+        "total_entries": 0,
+        "status_distribution": {},
+        "change_types": {"initial": 0, "status_change": 0, "periodic_save": 0}
+    }
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """Curseur opaque à partir de la clé de tri de la dernière entrée renvoyée"""
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except Exception:
+        raise ValueError("Curseur invalide")
+    if not isinstance(key, list):
+        raise ValueError("Curseur invalide")
+    return key
+
+
+def entry_timestamp_ms(entry: Dict[str, Any]) -> Optional[int]:
+    timestamp_ms = entry.get('timestamp_ms')
+    if timestamp_ms is not None:
+        return timestamp_ms
+    try:
+        return parse_timestamp_ms(entry['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def load_day_file(history_file: str, probe_ids: set, start_ms: int, end_ms: int,
+                  descending: bool) -> Dict[str, List[Dict[str, Any]]]:
+    """Un fichier journalier lu une seule fois, réparti et trié par sonde.
+
+    Fonction de module : exécutée dans les processus du pool de
+    JsonHistoryStorage (le décodage JSON ne libère pas le GIL).
+    """
+    if not os.path.exists(history_file):
+        return {}
+    with open(history_file, 'r', encoding='utf-8') as f:
+        history = json.load(f)
+
+    rows: Dict[str, list] = {}
+    for index, entry in enumerate(history):
+        probe_id = entry.get('id')
+        if probe_id not in probe_ids:
+            continue
+        timestamp_ms = entry_timestamp_ms(entry)
+        if timestamp_ms is not None and start_ms <= timestamp_ms < end_ms:
+            rows.setdefault(probe_id, []).append((timestamp_ms, index, entry))
+    return {
+        probe_id: [entry for _, _, entry in sorted(probe_rows, key=lambda row: (row[0], row[1]), reverse=descending)]
+        for probe_id, probe_rows in rows.items()
+    }
+
+
+class HistoryStorage:
+    """Interface commune des backends d'historique"""
+
+    name = 'base'
+    # True si statistics() est calculé par le backend sans relire les entrées
+    native_aggregates = False
+    # Types des éléments de la clé de position produite par iter_range()
+    cursor_types: Tuple[type, ...] = ()
+    clock: Clock = SYSTEM_CLOCK
+
+    def default_end(self, end: Optional[datetime]) -> datetime:
+        return end or self.clock.now() + timedelta(seconds=1)
+
+    def append(self, entries: List[Dict[str, Any]], operation: str):
+        raise NotImplementedError
+
+    def get_day(self, date: str, probe_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def iter_range(self, probe_id: str, start: datetime, end: Optional[datetime] = None,
+                   descending: bool = True, after: Optional[List[Any]] = None) -> Iterator[Tuple[List[Any], Dict[str, Any]]]:
+        """Génère (clé, entrée) pour une sonde dans [start, end[, dans l'ordre demandé
+
+        La clé identifie la position de l'entrée ; passée dans `after` (via
+        un curseur), la lecture reprend juste après cette entrée.
+        """
+        raise NotImplementedError
+
+    def check_cursor(self, key: List[Any]):
+        """Vérifie qu'une clé décodée d'un curseur correspond à ce backend"""
+        if len(key) != len(self.cursor_types) or not all(
+                isinstance(value, kind) for value, kind in zip(key, self.cursor_types)):
+            raise ValueError("Curseur invalide")
+
+    def get_range(self, probe_id: str, start: datetime, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Entrées d'une sonde dans [start, end[, de la plus récente à la plus ancienne"""
+        return [entry for _, entry in self.iter_range(probe_id, start, end)]
+
+    def load_range(self, probe_ids: List[str], start: datetime, end: Optional[datetime] = None,
+                   descending: bool = True, timeout: Optional[float] = None) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """Entrées de plusieurs sondes dans [start, end[, ordonnées, groupées par sonde
+
+        Renvoie aussi la liste des segments (jours) non chargés avant `timeout` :
+        le résultat est alors partiel.
+        """
+        return {probe_id: [entry for _, entry in self.iter_range(probe_id, start, end, descending)]
+                for probe_id in probe_ids}, []
+
+    def configure(self, options: Dict[str, Any]):
+        """Options modifiables sans recréer le backend (rechargement de config.json)"""
+
+    def statistics(self, probe_id: str, start: datetime, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """Comptages par statut et par type de changement sur une plage"""
+        return self.statistics_from(self.get_range(probe_id, start, end))
+
+    @classmethod
+    def statistics_from(cls, entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        stats = empty_statistics()
+        for entry in entries:
+            cls._count(stats, entry.get('status', 'unknown'), entry.get('change_type', 'unknown'))
+        return stats
+
+    def cleanup(self, cutoff: datetime):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _count(stats: Dict[str, Any], status: str, change_type: str, count: int = 1):
+        stats["total_entries"] += count
+        stats["status_distribution"][status] = stats["status_distribution"].get(status, 0) + count
+        if change_type in stats["change_types"]:
+            stats["change_types"][change_type] += count
+
+
+class JsonHistoryStorage(HistoryStorage):
+    """Un fichier <history_dir>/YYYY-MM-DD.json par jour"""
+
+    name = 'json'
+    cursor_types = (str, int, int)
+
+    def __init__(self, history_dir: str, clock: Clock = SYSTEM_CLOCK, workers: Optional[int] = None):
+        self.history_dir = history_dir
+        self.clock = clock
+        # Chargement des journées en parallèle dans des processus (lecture et
+        # décodage d'un fichier par tâche)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._closed = False
+
+    def day_file(self, date: str) -> str:
+        return os.path.join(self.history_dir, f"{date}.json")
+
+    def append(self, entries, operation):
+        today = self.clock.now().strftime('%Y-%m-%d')
+        history_file = self.day_file(today)
+
+        with metrics.history_write_duration.time(operation, 'load'):
+            if os.path.exists(history_file):
+                with open(history_file, 'r', encoding='utf-8') as f:
+                    history = json.load(f)
+            else:
+                history = []
+
+        history.extend(entries)
+
+        with metrics.history_write_duration.time(operation, 'serialize'):
+            payload = json.dumps(history, indent=2, ensure_ascii=False)
+
+        with metrics.history_write_duration.time(operation, 'flush'):
+            with open(history_file, 'w', encoding='utf-8') as f:
+                f.write(payload)
+
+        metrics.history_write_bytes.inc(operation, amount=len(payload.encode('utf-8')))
+
+    def get_day(self, date, probe_id=None):
+        history_file = self.day_file(date)
+        if not os.path.exists(history_file):
+            return []
+
+        with open(history_file, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+
+        if probe_id:
+            history = [h for h in history if h.get('id') == probe_id]
+        return history
+
+    @staticmethod
+    def _days(start: datetime, end: datetime, descending: bool) -> List[str]:
+        days = []
+        day = start.date()
+        while day <= end.date():
+            days.append(day.strftime('%Y-%m-%d'))
+            day += timedelta(days=1)
+        if descending:
+            days.reverse()
+        return days
+
+    def _pool_executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn : un fork copierait les verrous tenus par les threads du service
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+            metrics.register_queue('history_loader', self._queue_size)
+        return self._pool
+
+    def _queue_size(self) -> int:
+        """Journées en attente ou en cours de chargement"""
+        pool = self._pool
+        return len(pool._pending_work_items) if pool is not None else 0
+
+    def load_range(self, probe_ids, start, end=None, descending=True, timeout=None):
+        end = self.default_end(end)
+        start_ms, end_ms = int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+        days = [day for day in self._days(start, end, descending) if os.path.exists(self.day_file(day))]
+        wanted = set(probe_ids)
+
+        futures = None
+        if self.workers > 1 and len(days) > 1:
+            with self._pool_lock:
+                # Après close(), lecture dans le thread appelant (pas de nouveau pool)
+                if not self._closed:
+                    pool = self._pool_executor()
+                    futures = {day: pool.submit(load_day_file, self.day_file(day), wanted, start_ms, end_ms, descending)
+                               for day in days}
+
+        loaded = {}
+        if futures is None:
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            for day in days:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                loaded[day] = load_day_file(self.day_file(day), wanted, start_ms, end_ms, descending)
+        else:
+            wait(futures.values(), timeout=timeout)
+            for day, future in futures.items():
+                if not future.done():
+                    # Délai dépassé : la tâche est abandonnée (annulée si pas encore démarrée)
+                    future.cancel()
+                elif future.cancelled():
+                    continue  # pool arrêté par close() avant le chargement
+                elif future.exception() is not None:
+                    logger.error(f"Erreur lors du chargement de l'historique du {day}: {future.exception()}")
+                else:
+                    loaded[day] = future.result()
+
+        # Fusion dans l'ordre des jours (chaque journée est déjà triée)
+        merged: Dict[str, List[Dict[str, Any]]] = {probe_id: [] for probe_id in probe_ids}
+        for day in days:
+            for probe_id, entries in loaded.get(day, {}).items():
+                merged[probe_id].extend(entries)
+        return merged, [day for day in days if day not in loaded]
+
+    def configure(self, options):
+        workers = options.get('history_workers') or min(8, os.cpu_count() or 1)
+        if workers != self.workers:
+            with self._pool_lock:
+                self._shutdown_pool()  # le pool est recréé à la prochaine lecture
+                self.workers = workers
+
+    def _shutdown_pool(self):
+        """Annule les journées en attente et attend celles en cours de lecture"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            metrics.unregister_queue('history_loader', self._queue_size)
+
+    def close(self):
+        with self._pool_lock:
+            self._closed = True
+            self._shutdown_pool()
+
+    def iter_range(self, probe_id, start, end=None, descending=True, after=None):
+        # Clé : [jour du fichier, timestamp_ms, position dans le fichier]. Seul le
+        # contenu d'une journée est trié, les fichiers sont parcourus dans l'ordre.
+        end = self.default_end(end)
+        start_ms, end_ms = int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+        days = self._days(start, end, descending)
+
+        for date in days:
+            if after is not None and (date > after[0] if descending else date < after[0]):
+                continue
+
+            rows = []
+            for index, entry in enumerate(self.get_day(date, probe_id)):
+                timestamp_ms = entry_timestamp_ms(entry)
+                if timestamp_ms is not None and start_ms <= timestamp_ms < end_ms:
+                    rows.append((timestamp_ms, index, entry))
+            rows.sort(key=lambda row: (row[0], row[1]), reverse=descending)
+
+            for timestamp, index, entry in rows:
+                if after is not None and date == after[0]:
+                    position = (timestamp, index)
+                    reference = (after[1], after[2])
+                    if (position >= reference) if descending else (position <= reference):
+                        continue
+                yield [date, timestamp, index], entry
+
+    def cleanup(self, cutoff):
+        for filename in os.listdir(self.history_dir):
+            if filename.endswith('.json'):
+                try:
+                    file_date = datetime.strptime(filename.replace('.json', ''), '%Y-%m-%d')
+                except ValueError:
+                    continue
+
+                if file_date < cutoff:
+                    os.remove(os.path.join(self.history_dir, filename))
+                    logger.info(f"Historique supprimé: {filename}")
+
+
+class SqliteHistoryStorage(HistoryStorage):
+    """Base SQLite (WAL) : une ligne par entrée, le détail complet en JSON
+
+    Les plages, curseurs et la rétention portent sur timestamp_ms (epoch) :
+    l'horodatage ISO local, avec décalage, ne se trie pas correctement au
+    changement d'heure. Il ne sert plus qu'à sélectionner un jour local.
+    """
+
+    name = 'sqlite'
+    native_aggregates = True
+    cursor_types = (int, int)
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            probe_id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            timestamp_ms INTEGER,
+            status TEXT,
+            change_type TEXT,
+            response_time REAL,
+            data TEXT NOT NULL
+        )""",
+    )
+
+    INDEXES = (
+        "DROP INDEX IF EXISTS idx_history_probe_time",
+        "CREATE INDEX IF NOT EXISTS idx_history_probe_time_ms ON history (probe_id, timestamp_ms)",
+        "CREATE INDEX IF NOT EXISTS idx_history_time_ms ON history (timestamp_ms)",
+        "CREATE INDEX IF NOT EXISTS idx_history_time ON history (timestamp)",
+    )
+
+    def __init__(self, db_path: str, clock: Clock = SYSTEM_CLOCK):
+        self.db_path = db_path
+        self.clock = clock
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Connexions de tous les threads, fermées ensemble par close()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        connection = self.connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            self._migrate(connection)
+            for statement in self.INDEXES:
+                connection.execute(statement)
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection):
+        """Bases créées avant la colonne timestamp_ms : ajout et remplissage"""
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(history)")}
+        if 'timestamp_ms' in columns:
+            return
+        connection.execute("ALTER TABLE history ADD COLUMN timestamp_ms INTEGER")
+        rows = connection.execute("SELECT id, data FROM history").fetchall()
+        connection.executemany("UPDATE history SET timestamp_ms = ? WHERE id = ?",
+                               [(entry_timestamp_ms(json.loads(data)), row_id) for row_id, data in rows])
+        logger.info(f"Historique SQLite migré: timestamp_ms renseigné pour {len(rows)} entrées")
+
+    def connection(self) -> sqlite3.Connection:
+        """Une connexion par thread (les lectures WAL ne bloquent pas l'écriture)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # check_same_thread=False : close() ferme aussi les connexions des autres threads
+            connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def append(self, entries, operation):
+        with metrics.history_write_duration.time(operation, 'serialize'):
+            rows = [(
+                entry.get('id'),
+                entry.get('timestamp', ''),
+                entry_timestamp_ms(entry),
+                entry.get('status'),
+                entry.get('change_type'),
+                entry.get('response_time'),
+                json.dumps(entry, ensure_ascii=False)
+            ) for entry in entries]
+
+        with metrics.history_write_duration.time(operation, 'flush'), self._write_lock:
+            connection = self.connection()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO history (probe_id, timestamp, timestamp_ms, status, change_type, response_time, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+        metrics.history_write_bytes.inc(operation, amount=sum(len(row[-1]) for row in rows))
+
+    @staticmethod
+    def _decode(rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in rows]
+
+    def get_day(self, date, probe_id=None):
+        start = f"{date}T"
+        end = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%dT')
+        if probe_id:
+            rows = self.connection().execute(
+                "SELECT data FROM history WHERE probe_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY id",
+                (probe_id, start, end))
+        else:
+            rows = self.connection().execute(
+                "SELECT data FROM history WHERE timestamp >= ? AND timestamp < ? ORDER BY id", (start, end))
+        return self._decode(rows)
+
+    def _bounds(self, start: datetime, end: Optional[datetime]):
+        return int(start.timestamp() * 1000), int(self.default_end(end).timestamp() * 1000)
+
+    def iter_range(self, probe_id, start, end=None, descending=True, after=None):
+        # Clé : [timestamp_ms, id] ; pagination par clé (keyset) sur l'index (probe_id, timestamp_ms)
+        query = "SELECT timestamp_ms, id, data FROM history WHERE probe_id = ? AND timestamp_ms >= ? AND timestamp_ms < ?"
+        params = [probe_id, *self._bounds(start, end)]
+        if after is not None:
+            operator = '<' if descending else '>'
+            query += f" AND (timestamp_ms {operator} ? OR (timestamp_ms = ? AND id {operator} ?))"
+            params += [after[0], after[0], after[1]]
+        direction = 'DESC' if descending else 'ASC'
+        query += f" ORDER BY timestamp_ms {direction}, id {direction}"
+
+        cursor = self.connection().execute(query, params)
+        try:
+            for timestamp_ms, row_id, data in cursor:
+                yield [timestamp_ms, row_id], json.loads(data)
+        finally:
+            cursor.close()
+
+    def statistics(self, probe_id, start, end=None):
+        stats = empty_statistics()
+        rows = self.connection().execute(
+            "SELECT COALESCE(status, 'unknown'), COALESCE(change_type, 'unknown'), COUNT(*) FROM history "
+            "WHERE probe_id = ? AND timestamp_ms >= ? AND timestamp_ms < ? GROUP BY 1, 2",
+            (probe_id, *self._bounds(start, end)))
+        for status, change_type, count in rows:
+            self._count(stats, status, change_type, count)
+        return stats
+
+    def cleanup(self, cutoff):
+        with self._write_lock:
+            connection = self.connection()
+            with connection:
+                # Entrées sans horodatage exploitable : comparaison sur le texte, comme avant
+                deleted = connection.execute(
+                    "DELETE FROM history WHERE timestamp_ms < ? OR (timestamp_ms IS NULL AND timestamp < ?)",
+                    (int(cutoff.timestamp() * 1000), cutoff.isoformat())).rowcount
+        if deleted:
+            logger.info(f"Historique supprimé: {deleted} entrées antérieures au {cutoff.strftime('%Y-%m-%d')}")
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+def create_storage(backend: str, history_dir: str, options: Optional[Dict[str, Any]] = None,
+                   clock: Clock = SYSTEM_CLOCK) -> HistoryStorage:
+    """Instancie le backend demandé (settings.history_backend de config.json)"""
+    options = options or {}
+    if backend == 'json':
+        return JsonHistoryStorage(history_dir, clock, options.get('history_workers'))
+    if backend == 'sqlite':
+        return SqliteHistoryStorage(options.get('history_db') or os.path.join(history_dir, 'history.db'), clock)
+    raise ValueError(f"Backend d'historique non supporté: {backend}")
@@ -0,0 +1,77 @@
+"""Vérifications HTTP tracées étape par étape (traces de profiling.tracer).
+
+requests ne donne que la durée totale d'une requête. Quand les traces sont
+actives, les vérifications HTTP passent par une session dont les connexions
+urllib3 résolvent le nom elles-mêmes : la résolution DNS (span ``resolve``)
+et l'ouverture de la connexion TCP (span ``connect``, une tentative par
+adresse comme urllib3) sont alors mesurées séparément. La poignée de main
+TLS et l'échange HTTP restent dans le span ``request`` englobant.
+"""
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+from profiling import tracer
+
+
+class TracedConnectionMixin:
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host
+        try:
+            with tracer.span('resolve', type='http'):
+                addresses = list(dict.fromkeys(
+                    info[4][0] for info in socket.getaddrinfo(host.strip('[]'), self.port, allowed_gai_family(),
+                                                              socket.SOCK_STREAM)))
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+
+        with tracer.span('connect', type='http', addresses=len(addresses)):
+            for index, address in enumerate(addresses):
+                # Adresse numérique : urllib3 se connecte sans nouvelle résolution
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    if index == len(addresses) - 1:
+                        raise
+                finally:
+                    self._dns_host = host
+
+
+class TracedHTTPConnection(TracedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TracedHTTPSConnection(TracedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracedHTTPConnection
+
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+
+class TracedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TracedHTTPConnectionPool,
+            "https": TracedHTTPSConnectionPool
+        }
+
+
+def traced_session() -> requests.Session:
+    """Session dont les connexions HTTP/HTTPS sont tracées"""
+    session = requests.Session()
+    adapter = TracedAdapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,154 @@
+"""Configuration du logging commune au launcher et au backend.
+
+Les appels de log ne font que déposer l'enregistrement dans une file
+(QueueHandler) ; l'écriture, la rotation (heure et taille) et la
+compression gzip des anciens fichiers sont faites par le thread du
+QueueListener, hors des threads de vérification et de requêtes.
+
+Variables d'environnement :
+    LOG_FORMAT        text (défaut) ou json
+    LOG_ROTATE_WHEN   moment de rotation (défaut : midnight)
+    LOG_MAX_BYTES     taille maximale d'un fichier avant rotation (défaut : 10 Mo)
+    LOG_BACKUP_COUNT  nombre d'archives conservées (défaut : 14)
+    LOG_COMPRESS      compresser les archives (défaut : true)
+
+Ce module ne dépend d'aucun autre module du backend pour pouvoir être
+importé par le launcher.
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import List, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listeners: List[QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class RotatingLogFileHandler(TimedRotatingFileHandler):
+    """Rotation à heure fixe ou dès que le fichier dépasse max_bytes, archives gzip"""
+
+    def __init__(self, filename: str, when: str = 'midnight', max_bytes: int = 0,
+                 backup_count: int = 14, compress: bool = True):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.namer = self._unique_name
+        if compress:
+            self.rotator = self._compress
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            self.stream.seek(0, 2)
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def _unique_name(self, default_name: str) -> str:
+        # Plusieurs rotations par taille dans le même intervalle : suffixe .1, .2...
+        extension = '.gz' if self.compress else ''
+        name, index = f"{default_name}{extension}", 1
+        while os.path.exists(name):
+            name = f"{default_name}.{index}{extension}"
+            index += 1
+        return name
+
+    @staticmethod
+    def _compress(source: str, destination: str):
+        with open(source, 'rb') as f_in, gzip.open(destination, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def getFilesToDelete(self) -> List[str]:
+        directory, base = os.path.split(self.baseFilename)
+        archives = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(base + '.')
+        ]
+        if len(archives) <= self.backupCount:
+            return []
+        archives.sort(key=os.path.getmtime)
+        return archives[:len(archives) - self.backupCount]
+
+
+def make_formatter(json_format: Optional[bool] = None) -> logging.Formatter:
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+    return JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+
+def make_file_handler(path: str, formatter: Optional[logging.Formatter] = None) -> RotatingLogFileHandler:
+    handler = RotatingLogFileHandler(
+        path,
+        when=os.getenv('LOG_ROTATE_WHEN', 'midnight'),
+        max_bytes=int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+        backup_count=int(os.getenv('LOG_BACKUP_COUNT', 14)),
+        compress=os.getenv('LOG_COMPRESS', 'true').lower() not in ('0', 'false', 'no')
+    )
+    handler.setFormatter(formatter or make_formatter())
+    return handler
+
+
+def attach_queue(logger: logging.Logger, handlers: List[logging.Handler], level: int = logging.INFO) -> QueueListener:
+    """Remplace les handlers du logger par un QueueHandler vidé par un thread dédié"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        atexit.register(stop_logging)
+    _listeners.append(listener)
+    return listener
+
+
+def detach_queue(logger: logging.Logger, listener: QueueListener):
+    """Inverse de attach_queue() : vide la file, arrête le thread et retire le QueueHandler"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+        listener.stop()
+    logger.handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+
+
+def configure_logging(log_file: Optional[str] = None, console=sys.stderr, level: int = logging.INFO) -> QueueListener:
+    """Logging racine non bloquant : console et/ou fichier avec rotation"""
+    formatter = make_formatter()
+    handlers: List[logging.Handler] = []
+    if console is not None:
+        console_handler = logging.StreamHandler(console)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    if log_file:
+        handlers.append(make_file_handler(log_file, formatter))
+    return attach_queue(logging.getLogger(), handlers, level)
+
+
+def stop_logging():
+    """Vide les files et arrête les threads d'écriture"""
+    while _listeners:
+        _listeners.pop().stop()
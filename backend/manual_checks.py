@@ -0,0 +1,214 @@
+"""Vérifications manuelles (POST /api/check/<probe_id>).
+
+- single-flight : les demandes simultanées pour une même sonde partagent
+  la vérification en cours au lieu d'en lancer chacune une ;
+- cache : un résultat reste servi pendant `cache_ttl` secondes ;
+- limitation : au plus une nouvelle vérification par sonde toutes les
+  `min_interval` secondes ; au-delà, le dernier résultat est servi comme
+  périmé (origine 'stale'), ou RateLimited s'il n'y en a aucun ;
+- mode asynchrone : submit() renvoie un identifiant de tâche, la
+  vérification tourne dans un pool borné et le résultat est consultable
+  ensuite, sans occuper de thread de requête. Un vol annulé par stop()
+  ou refusé par le pool arrêté se termine en erreur.
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+from clock import SYSTEM_CLOCK, Clock
+from results import iso_timestamp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "cache_ttl": 5,
+    "min_interval": 10,
+    "workers": 4,
+    "job_ttl": 300,
+    "max_jobs": 1000,
+    "wait_timeout": 60
+}
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Vérification manuelle limitée, réessayer dans {max(1, math.ceil(retry_after))}s")
+        self.retry_after = retry_after
+
+
+class Flight:
+    """Vérification en cours, partagée par tous ceux qui l'attendent"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.callbacks = []
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"Vérification manuelle toujours en cours après {timeout}s")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ManualCheckRunner:
+    def __init__(self, check: Callable[[Dict[str, Any]], Dict[str, Any]], settings: Dict[str, Any] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.check = check
+        self.clock = clock
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.lock = threading.Lock()
+        self.flights: Dict[str, Flight] = {}
+        self.cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.last_started: Dict[str, float] = {}
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=self.settings['workers'], thread_name_prefix='manual-check')
+        metrics.register_queue('manual_checks', lambda: self.executor._work_queue.qsize())
+
+    def configure(self, settings: Dict[str, Any] = None):
+        with self.lock:
+            workers = self.settings['workers']
+            self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+            self.settings['workers'] = workers  # taille du pool fixée au démarrage
+
+    def _acquire(self, probe_id: str) -> Tuple[str, Any]:
+        """('cache' ou 'stale', résultat), ('coalesced', vol en cours) ou ('fresh', nouveau vol)"""
+        now = time.monotonic()
+        with self.lock:
+            cached = self.cache.get(probe_id)
+            if cached and now - cached[0] < self.settings['cache_ttl']:
+                metrics.record_cache('manual_check', True)
+                return 'cache', cached[1]
+            metrics.record_cache('manual_check', False)
+
+            flight = self.flights.get(probe_id)
+            if flight is not None:
+                return 'coalesced', flight
+
+            last = self.last_started.get(probe_id)
+            if last is not None and now - last < self.settings['min_interval']:
+                if cached:
+                    return 'stale', cached[1]
+                raise RateLimited(self.settings['min_interval'] - (now - last))
+
+            flight = self.flights[probe_id] = Flight()
+            self.last_started[probe_id] = now
+            return 'fresh', flight
+
+    def _fly(self, probe: Dict[str, Any], flight: Flight):
+        try:
+            flight.result = self.check(probe)
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification manuelle de {probe['id']}: {e}")
+            flight.error = e
+        finally:
+            self._land(probe['id'], flight)
+
+    def _land(self, probe_id: str, flight: Flight):
+        """Fin du vol : résultat en cache, attentes et tâches débloquées"""
+        with self.lock:
+            if flight.result is not None:
+                self.cache[probe_id] = (time.monotonic(), flight.result)
+            self.flights.pop(probe_id, None)
+            flight.done.set()
+            callbacks, flight.callbacks = flight.callbacks, []
+        for callback in callbacks:
+            callback(flight)
+
+    def _abort(self, probe_id: str, flight: Flight, reason: str):
+        logger.warning(f"⚠️ Vérification manuelle de {probe_id} abandonnée: {reason}")
+        flight.error = RuntimeError(reason)
+        self._land(probe_id, flight)
+
+    def run(self, probe: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Vérification synchrone : renvoie (résultat, origine)"""
+        source, value = self._acquire(probe['id'])
+        if source in ('cache', 'stale'):
+            return value, source
+        if source == 'fresh':
+            self._fly(probe, value)
+        return value.wait(self.settings['wait_timeout']), source
+
+    def submit(self, probe: Dict[str, Any]) -> Dict[str, Any]:
+        """Vérification asynchrone : renvoie la tâche (identifiant et état)"""
+        source, value = self._acquire(probe['id'])
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "probe_id": probe['id'],
+            "status": "running",
+            "source": source,
+            "created_at": iso_timestamp(self.clock.time_ms()),
+            "result": None,
+            "error": None
+        }
+
+        if source in ('cache', 'stale'):
+            job.update(status="done", result=value)
+            self._store(job)
+            return self._public(job)
+
+        self._store(job)
+        # Pas de thread bloqué en attente : la tâche est complétée à la fin du vol
+        with self.lock:
+            if value.done.is_set():
+                finished = True
+            else:
+                value.callbacks.append(lambda flight: self._complete(job, flight))
+                finished = False
+        if finished:
+            self._complete(job, value)
+        if source == 'fresh':
+            try:
+                future = self.executor.submit(self._fly, probe, value)
+            except RuntimeError:
+                self._abort(probe['id'], value, "service arrêté")
+            else:
+                future.add_done_callback(lambda f: self._cancelled(probe['id'], value, f))
+        with self.lock:
+            return self._public(job)
+
+    def _cancelled(self, probe_id: str, flight: Flight, future: Future):
+        # Tâche retirée du pool par stop() avant d'avoir démarré
+        if future.cancelled():
+            self._abort(probe_id, flight, "service arrêté")
+
+    def _complete(self, job: Dict[str, Any], flight: Flight):
+        with self.lock:
+            if flight.error is not None:
+                job.update(status="error", error=str(flight.error))
+            else:
+                job.update(status="done", result=flight.result)
+            job['_finished'] = time.monotonic()
+
+    def _store(self, job: Dict[str, Any]):
+        with self.lock:
+            now = time.monotonic()
+            while self.jobs:
+                oldest = next(iter(self.jobs.values()))
+                expired = now - oldest.get('_finished', now) > self.settings['job_ttl']
+                if not expired and len(self.jobs) < self.settings['max_jobs']:
+                    break
+                self.jobs.popitem(last=False)
+            if job['status'] == 'done':
+                job['_finished'] = now
+            self.jobs[job['job_id']] = job
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if not k.startswith('_')}
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return self._public(job) if job is not None else None
+
+    def stop(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,272 @@
+"""Métriques internes exposées au format texte Prometheus/OpenMetrics.
+
+Les compteurs sont gardés en mémoire dans le processus : une observation
+coûte un verrou et quelques additions, le rendu texte n'est fait qu'au
+moment du scrape.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: labels attendus {self.labelnames}, reçus {labels}")
+        return tuple(str(v) for v in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback: Optional[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = None
+
+    def set(self, *labels, value: float) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> None:
+        """Calcule les valeurs au moment du scrape plutôt qu'à chaque mise à jour"""
+        self._callback = callback
+
+    def samples(self):
+        if self._callback is not None:
+            try:
+                items = [(self._key(tuple(k)), v) for k, v in self._callback()]
+            except Exception:
+                # Une source défaillante ne doit pas faire échouer tout le scrape
+                items = []
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                for k, v in items if v is not None]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # clé -> [compteurs par bucket..., somme, total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, *labels, value: float) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                row[index] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def time(self, *labels) -> '_Timer':
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for key, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {int(row[-1])}")
+            base = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {_format_value(row[-2])}")
+            lines.append(f"{self.name}_count{base} {int(row[-1])}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(*self.labels, value=time.perf_counter() - self.start)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà enregistrée: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Résultats des sondes (calculés au scrape à partir de current_status)
+probe_up = registry.gauge(
+    'uptimecore_probe_up', "1 si la sonde est en ligne (online/slow), 0 sinon", ('probe_id', 'type'))
+probe_response_time = registry.gauge(
+    'uptimecore_probe_response_time_ms', "Dernier temps de réponse mesuré", ('probe_id', 'type'))
+probe_check_interval = registry.gauge(
+    'uptimecore_probe_check_interval_seconds', "Intervalle de vérification adaptatif courant", ('probe_id',))
+
+# Moteur de monitoring
+check_duration = registry.histogram(
+    'uptimecore_check_duration_seconds', "Durée d'une vérification par type de sonde", ('type',))
+checks_total = registry.counter(
+    'uptimecore_checks_total', "Nombre de vérifications par type et statut", ('type', 'status'))
+round_duration = registry.histogram(
+    'uptimecore_monitoring_round_duration_seconds', "Durée d'un tour complet de monitoring",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+scheduler_lag = registry.gauge(
+    'uptimecore_scheduler_lag_seconds', "Retard du dernier tour par rapport à l'heure prévue")
+status_changes_total = registry.counter(
+    'uptimecore_status_changes_total', "Transitions d'état enregistrées", ('change_type',))
+confirmations_total = registry.counter(
+    'uptimecore_failure_confirmations_total', "Issue des confirmations d'échec", ('result',))
+
+# Historique
+history_write_duration = registry.histogram(
+    'uptimecore_history_write_duration_seconds', "Latence d'écriture de l'historique",
+    ('operation', 'phase'))
+history_write_bytes = registry.counter(
+    'uptimecore_history_write_bytes_total', "Octets écrits dans l'historique", ('operation',))
+history_query_duration = registry.histogram(
+    'uptimecore_history_query_duration_seconds', "Latence des requêtes d'historique", ('query',))
+notifications_total = registry.counter(
+    'uptimecore_notifications_total', "Événements de notification par destination et issue",
+    ('destination', 'result'))
+
+# Caches et files d'attente
+cache_requests = registry.counter(
+    'uptimecore_cache_requests_total', "Accès aux caches internes", ('cache', 'result'))
+threads = registry.gauge(
+    'uptimecore_threads', "Nombre de threads actifs dans le processus")
+threads.set_function(lambda: [((), threading.active_count())])
+queue_depth = registry.gauge(
+    'uptimecore_queue_depth', "Profondeur des files d'attente internes", ('queue',))
+
+_queue_sources: Dict[str, Callable[[], int]] = {}
+
+
+def register_queue(name: str, size_callback: Callable[[], int]) -> None:
+    """Expose la profondeur d'une file interne (lue au moment du scrape)"""
+    _queue_sources[name] = size_callback
+
+
+def unregister_queue(name: str, size_callback: Optional[Callable[[], int]] = None) -> None:
+    """Retire une file (seulement si elle est toujours associée à `size_callback`, s'il est fourni)"""
+    if size_callback is None or _queue_sources.get(name) == size_callback:
+        _queue_sources.pop(name, None)
+
+
+def _queue_depths() -> List[Tuple[Tuple[str, ...], float]]:
+    depths = []
+    for name, size_callback in list(_queue_sources.items()):
+        try:
+            depths.append(((name,), size_callback()))
+        except Exception:
+            continue
+    return depths
+
+
+queue_depth.set_function(_queue_depths)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    cache_requests.inc(cache, 'hit' if hit else 'miss')
@@ -0,0 +1,275 @@
+"""Envoi asynchrone des notifications de changement d'état.
+
+Le thread de monitoring ne fait que déposer l'événement dans une file
+bornée (sans jamais bloquer). Un thread de regroupement coalesce les
+transitions d'une même sonde sur une fenêtre courte, puis chaque
+destination a sa propre file, sa session HTTP (pool de connexions) et ses
+tentatives avec backoff exponentiel : une destination lente ou hors ligne
+ne retarde ni les vérifications ni les autres destinations.
+
+Au rechargement de la configuration, l'ancien répartiteur est arrêté puis
+passe la main au nouveau (hand_over) : les événements encore en file ou
+en cours de regroupement, et les lots des destinations conservées (même
+identifiant), sont repris au lieu d'être perdus.
+"""
+import logging
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "queue_size": 1000,
+    "batch_window": 5,
+    "max_batch": 100,
+    "max_retries": 5,
+    "backoff_base": 1,
+    "backoff_max": 60
+}
+
+
+class WebhookDestination:
+    """Destination HTTP : POST JSON d'un lot d'événements"""
+
+    def __init__(self, config: Dict[str, Any], settings: Dict[str, Any]):
+        self.id = config.get('id') or config['url']
+        self.url = config['url']
+        self.headers = {"Content-Type": "application/json", **config.get('headers', {})}
+        self.timeout = config.get('timeout', 5)
+        self.max_retries = config.get('max_retries', settings['max_retries'])
+        self.backoff_base = config.get('backoff_base', settings['backoff_base'])
+        self.backoff_max = config.get('backoff_max', settings['backoff_max'])
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.queue: queue.Queue = queue.Queue(maxsize=config.get('queue_size', 100))
+        # Lot interrompu par l'arrêt pendant ses tentatives, repris par pending()
+        self.unsent: List[List[Dict[str, Any]]] = []
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"notify-{self.id}", daemon=True)
+        metrics.register_queue(f"notifications:{self.id}", self.queue.qsize)
+
+    def payload(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "source": "uptimecore",
+            "sent_at": datetime.now().isoformat(),
+            "events": events
+        }
+
+    def send(self, events: List[Dict[str, Any]]):
+        response = self.session.post(self.url, json=self.payload(events),
+                                     headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+
+    def submit(self, events: List[Dict[str, Any]]):
+        try:
+            self.queue.put_nowait(events)
+        except queue.Full:
+            metrics.notifications_total.inc(self.id, 'dropped', amount=len(events))
+            logger.warning(f"File de notification pleine pour {self.id}, {len(events)} événement(s) ignoré(s)")
+
+    def deliver(self, events: List[Dict[str, Any]]):
+        """Envoie un lot avec tentatives et backoff exponentiel (avec gigue)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.send(events)
+                metrics.notifications_total.inc(self.id, 'sent', amount=len(events))
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    metrics.notifications_total.inc(self.id, 'failed', amount=len(events))
+                    logger.error(f"Notification abandonnée pour {self.id} après {attempt + 1} essai(s): {e}")
+                    return False
+                metrics.notifications_total.inc(self.id, 'retried')
+                delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"Échec de notification vers {self.id} ({e}), nouvel essai dans {delay:.1f}s")
+                if self.stopping.wait(delay):
+                    # Arrêt pendant l'attente : le lot est repris par pending()
+                    self.unsent.append(events)
+                    logger.info(f"Notification vers {self.id} interrompue par l'arrêt, lot conservé")
+                    return False
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                events = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.deliver(events)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, timeout: float = 2):
+        self.stopping.set()
+        self.thread.join(timeout=timeout)
+        self.session.close()
+        metrics.unregister_queue(f"notifications:{self.id}", self.queue.qsize)
+
+    def pending(self) -> List[List[Dict[str, Any]]]:
+        """Lots non envoyés (après stop), dans l'ordre"""
+        batches, self.unsent = self.unsent, []
+        while True:
+            try:
+                batches.append(self.queue.get_nowait())
+            except queue.Empty:
+                return batches
+
+
+DESTINATION_TYPES = {
+    'webhook': WebhookDestination
+}
+
+
+class NotificationDispatcher:
+    """File bornée + regroupement des transitions avant envoi aux destinations"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.settings = {**DEFAULT_SETTINGS, **{k: v for k, v in config.items() if k in DEFAULT_SETTINGS}}
+        self.destinations = []
+        for destination in config.get('destinations', []):
+            destination_type = destination.get('type', 'webhook')
+            if destination_type not in DESTINATION_TYPES:
+                logger.error(f"Type de destination non supporté: {destination_type}")
+                continue
+            self.destinations.append(DESTINATION_TYPES[destination_type](destination, self.settings))
+
+        self.queue: queue.Queue = queue.Queue(maxsize=self.settings['queue_size'])
+        # Événements en cours de regroupement au moment de l'arrêt
+        self.unsent: List[Dict[str, Any]] = []
+        # Répartiteur qui a repris la main (événements reçus après hand_over)
+        self.successor: Optional['NotificationDispatcher'] = None
+        self.stopping = threading.Event()
+        self.thread = None
+        metrics.register_queue('notifications', self.queue.qsize)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.destinations)
+
+    def notify(self, event: Dict[str, Any]):
+        """Dépose un événement sans jamais bloquer l'appelant"""
+        successor = self.successor
+        if successor is not None:
+            successor.notify(event)
+            return
+        if not self.enabled:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            metrics.notifications_total.inc('*', 'dropped')
+            logger.warning(f"File de notifications pleine, événement ignoré pour {event.get('probe_id')}")
+
+    def coalesce(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fusionne les transitions successives d'une même sonde (battements)"""
+        by_probe: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            probe_id = event['probe_id']
+            merged = by_probe.get(probe_id)
+            if merged is None:
+                by_probe[probe_id] = {**event, "transitions": 1, "flapping": False}
+                continue
+            merged.update({k: v for k, v in event.items() if k != 'previous_status'})
+            merged["transitions"] += 1
+            merged["flapping"] = True
+        return list(by_probe.values())
+
+    def run(self):
+        window = self.settings['batch_window']
+        max_batch = self.settings['max_batch']
+        while not self.stopping.is_set():
+            try:
+                first = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + window
+            while len(batch) < max_batch and not self.stopping.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+
+            if self.stopping.is_set():
+                # Arrêt pendant le regroupement : les événements sont repris par hand_over()
+                self.unsent = batch
+                break
+
+            events = self.coalesce(batch)
+            for destination in self.destinations:
+                destination.submit(events)
+
+    def start(self):
+        if not self.enabled or self.thread is not None:
+            return
+        for destination in self.destinations:
+            destination.start()
+        self.thread = threading.Thread(target=self.run, name='notifications', daemon=True)
+        self.thread.start()
+        logger.info(f"Notifications actives vers {len(self.destinations)} destination(s)")
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+        for destination in self.destinations:
+            destination.stop()
+        metrics.unregister_queue('notifications', self.queue.qsize)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Événements pas encore regroupés (après stop), dans l'ordre d'arrivée"""
+        events, self.unsent = self.unsent, []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def hand_over(self, successor: 'NotificationDispatcher'):
+        """Transmet au nouveau répartiteur (rechargement) ce qui n'a pas été envoyé
+
+        À appeler après stop() et avant successor.start(). Les lots déjà
+        regroupés suivent leur destination si elle existe toujours.
+        """
+        successors = {destination.id: destination for destination in successor.destinations}
+        batches = 0
+        for destination in self.destinations:
+            for events in destination.pending():
+                if destination.id in successors:
+                    successors[destination.id].submit(events)
+                    batches += 1
+                else:
+                    metrics.notifications_total.inc(destination.id, 'dropped', amount=len(events))
+                    logger.warning(f"Destination {destination.id} retirée, {len(events)} événement(s) ignoré(s)")
+
+        events = self.pending()
+        self.successor = successor
+        # Événements déposés pendant le transfert
+        events += self.pending()
+        if events and not successor.enabled:
+            metrics.notifications_total.inc('*', 'dropped', amount=len(events))
+            logger.warning(f"Notifications désactivées, {len(events)} événement(s) en attente ignoré(s)")
+        for event in events:
+            successor.notify(event)
+        if successor.enabled and (events or batches):
+            logger.info(f"Notifications reprises après rechargement: {len(events)} événement(s), {batches} lot(s)")
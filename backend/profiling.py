@@ -0,0 +1,211 @@
+"""Profilage à la demande et traces par vérification.
+
+Rien n'est actif par défaut : le profileur échantillonne les piles de tous
+les threads depuis un thread dédié uniquement pendant une session, et le
+traceur renvoie un contexte vide tant qu'il n'est pas activé.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+_NULL_CONTEXT = nullcontext()
+
+
+class ProfilerSession:
+    """Session de profilage limitée dans le temps (échantillonnage ou cProfile)"""
+
+    MODES = ('sample', 'cprofile')
+
+    def __init__(self, mode: str = 'sample', duration: float = 30, interval: float = 0.01):
+        if mode not in self.MODES:
+            raise ValueError(f"Mode de profilage inconnu: {mode}")
+        self.mode = mode
+        self.duration = duration
+        self.interval = interval
+        self.started_at = time.time()
+        self.stopped_at: Optional[float] = None
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._profile: Optional[cProfile.Profile] = cProfile.Profile() if mode == 'cprofile' else None
+        self._profile_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    @property
+    def active(self) -> bool:
+        return self.stopped_at is None
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=2)
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def _run(self):
+        deadline = self.started_at + self.duration
+        own_id = threading.get_ident()
+        while not self._stop.is_set() and time.time() < deadline:
+            if self.mode == 'sample':
+                self._sample(own_id)
+            self._stop.wait(self.interval)
+        self.stopped_at = time.time()
+
+    def _sample(self, own_id: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self._stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def round_context(self):
+        """Contexte à placer autour d'un tour de monitoring (mode cprofile)"""
+        if self._profile is None or not self.active:
+            return _NULL_CONTEXT
+        return _ProfiledRound(self)
+
+    def result(self) -> str:
+        """Résultat au format « collapsed stacks » (flamegraph) ou texte pstats"""
+        if self.mode == 'sample':
+            return ''.join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+        output = io.StringIO()
+        with self._profile_lock:
+            try:
+                stats = pstats.Stats(self._profile, stream=output)
+            except TypeError:
+                return "Aucun tour de monitoring profilé\n"
+            stats.sort_stats('cumulative').print_stats(50)
+        return output.getvalue()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "active": self.active,
+            "duration": self.duration,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "samples": self.samples
+        }
+
+
+class _ProfiledRound:
+    __slots__ = ('session',)
+
+    def __init__(self, session: ProfilerSession):
+        self.session = session
+
+    def __enter__(self):
+        self.session._profile_lock.acquire()
+        self.session._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.session._profile.disable()
+        self.session._profile_lock.release()
+        return False
+
+
+class Profiler:
+    """Point d'entrée unique : une seule session à la fois"""
+
+    def __init__(self):
+        self.session: Optional[ProfilerSession] = None
+        self._lock = threading.Lock()
+
+    def start(self, mode: str = 'sample', duration: float = 30, interval: float = 0.01) -> ProfilerSession:
+        with self._lock:
+            if self.session is not None and self.session.active:
+                raise RuntimeError("Une session de profilage est déjà en cours")
+            self.session = ProfilerSession(mode, duration, interval)
+            self.session.start()
+            return self.session
+
+    def stop(self) -> Optional[ProfilerSession]:
+        with self._lock:
+            if self.session is not None:
+                self.session.stop()
+            return self.session
+
+    def round_context(self):
+        session = self.session
+        if session is None:
+            return _NULL_CONTEXT
+        return session.round_context()
+
+
+class Tracer:
+    """Spans par vérification conservés dans un tampon circulaire borné"""
+
+    def __init__(self, capacity: int = 2000):
+        self.enabled = False
+        self.spans: deque = deque(maxlen=capacity)
+        self._local = threading.local()
+
+    def configure(self, enabled: bool, capacity: Optional[int] = None):
+        if capacity is not None and capacity != self.spans.maxlen:
+            self.spans = deque(self.spans, maxlen=capacity)
+        self.enabled = enabled
+
+    def bind(self, probe_id: Optional[str]):
+        """Associe les spans suivants du thread courant à une sonde"""
+        self._local.probe_id = probe_id
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Span(self, name, attributes)
+
+    def export(self, probe_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        spans = list(self.spans)
+        if probe_id:
+            spans = [s for s in spans if s.get('probe_id') == probe_id]
+        if limit:
+            spans = spans[-limit:]
+        return spans
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'attributes', 'start', 'wall_start')
+
+    def __init__(self, tracer: Tracer, name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.spans.append({
+            "name": self.name,
+            "probe_id": getattr(self.tracer._local, 'probe_id', None),
+            "thread": threading.current_thread().name,
+            "start": self.wall_start,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "error": repr(exc) if exc is not None else None,
+            **self.attributes
+        })
+        return False
+
+
+profiler = Profiler()
+tracer = Tracer()
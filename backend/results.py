@@ -0,0 +1,128 @@
+"""Représentation compacte des résultats de vérification.
+
+Un résultat garde une référence vers la sonde (pas de copie de id, nom,
+type, cible), un horodatage entier en millisecondes depuis l'epoch et un
+statut énuméré (membres uniques, comparables aux chaînes). La conversion
+en dictionnaire JSON, avec un horodatage ISO 8601 portant le décalage
+horaire, n'est faite qu'à la sortie (API, historique, instantané).
+"""
+from datetime import datetime, tzinfo
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+
+class Status(str, Enum):
+    ONLINE = "online"
+    SLOW = "slow"
+    TIMEOUT = "timeout"
+    ERROR = "error"
+    OFFLINE = "offline"
+    UNKNOWN = "unknown"
+
+    def __str__(self) -> str:
+        return self.value
+
+    @classmethod
+    def parse(cls, value: Any) -> "Status":
+        return cls._value2member_map_.get(value, cls.UNKNOWN)
+
+
+BASE_FIELDS = frozenset(('id', 'name', 'type', 'target', 'timestamp', 'timestamp_ms',
+                         'status', 'response_time', 'error', 'stale'))
+
+OFFSET_BUCKET_MS = 15 * 60 * 1000
+
+_local_zones: Dict[int, tzinfo] = {}
+
+
+def local_timezone(timestamp_ms: int) -> tzinfo:
+    """Décalage local en vigueur à cet instant (mis en cache par quart d'heure, changements d'heure compris)"""
+    bucket = timestamp_ms // OFFSET_BUCKET_MS
+    zone = _local_zones.get(bucket)
+    if zone is None:
+        if len(_local_zones) > 1024:
+            _local_zones.clear()
+        zone = _local_zones[bucket] = datetime.fromtimestamp(bucket * OFFSET_BUCKET_MS / 1000).astimezone().tzinfo
+    return zone
+
+
+def iso_timestamp(timestamp_ms: int) -> str:
+    """Heure locale avec décalage, à la milliseconde (ex. 2024-03-31T02:30:00.000+02:00)"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, local_timezone(timestamp_ms)).isoformat(timespec='milliseconds')
+
+
+def parse_timestamp_ms(value: str) -> int:
+    """Horodatage ISO (avec ou sans décalage, naïf = heure locale) -> epoch ms"""
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+class CheckResult:
+    """Résultat d'une vérification de sonde"""
+
+    __slots__ = ('probe', 'timestamp_ms', 'status', 'response_time', 'error', 'details', 'stale')
+
+    def __init__(self, probe: Dict[str, Any], timestamp_ms: int, status: Status,
+                 response_time: Optional[float] = None, error: Optional[str] = None,
+                 details: Tuple[Tuple[str, Any], ...] = (), stale: bool = False):
+        self.probe = probe
+        self.timestamp_ms = timestamp_ms
+        self.status = status
+        self.response_time = response_time
+        self.error = error
+        # Champs propres au type de sonde (http_status, rcode...) : paires (clé, valeur)
+        self.details = details
+        self.stale = stale
+
+    @property
+    def id(self) -> str:
+        return self.probe['id']
+
+    @property
+    def timestamp(self) -> str:
+        return iso_timestamp(self.timestamp_ms)
+
+    @classmethod
+    def from_check(cls, probe: Dict[str, Any], timestamp_ms: int, outcome: Dict[str, Any]) -> "CheckResult":
+        """À partir du dictionnaire renvoyé par un ping_check, http_check..."""
+        details = tuple(item for item in outcome.items() if item[0] not in BASE_FIELDS)
+        return cls(probe, timestamp_ms, Status.parse(outcome.get('status')),
+                   outcome.get('response_time'), outcome.get('error'), details)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], probe: Dict[str, Any], stale: bool = False) -> "CheckResult":
+        """Inverse de to_dict() (rechargement de l'instantané de statut)"""
+        timestamp_ms = data.get('timestamp_ms')
+        if timestamp_ms is None:
+            timestamp_ms = parse_timestamp_ms(data['timestamp'])
+        details = tuple(item for item in data.items() if item[0] not in BASE_FIELDS)
+        return cls(probe, timestamp_ms, Status.parse(data.get('status')),
+                   data.get('response_time'), data.get('error'), details, stale)
+
+    def to_row(self) -> list:
+        """Forme compacte pour l'instantané de statut (sans copie des champs de la sonde)"""
+        return [self.timestamp_ms, self.status.value, self.response_time, self.error,
+                dict(self.details) if self.details else None]
+
+    @classmethod
+    def from_row(cls, row: list, probe: Dict[str, Any], stale: bool = False) -> "CheckResult":
+        timestamp_ms, status, response_time, error, details = row
+        return cls(probe, timestamp_ms, Status.parse(status), response_time, error,
+                   tuple(details.items()) if details else (), stale)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "id": self.probe['id'],
+            "name": self.probe.get('name'),
+            "type": self.probe.get('type'),
+            "target": self.probe.get('target'),
+            "timestamp": iso_timestamp(self.timestamp_ms),
+            "timestamp_ms": self.timestamp_ms,
+            "status": self.status.value,
+            "response_time": self.response_time,
+            "error": self.error
+        }
+        if self.details:
+            data.update(self.details)
+        if self.stale:
+            data["stale"] = True
+        return data
@@ -0,0 +1,101 @@
+"""Planification adaptative des vérifications.
+
+Chaque sonde a son propre intervalle : il s'allonge tant que le statut est
+stable (jusqu'à ``max_interval``) et revient à l'intervalle de base dès
+qu'il change. Un premier échec déclenche des re-vérifications rapprochées
+avant d'être enregistré comme ``status_change``.
+"""
+from typing import Any, Dict, Optional
+
+FAILURE_STATUSES = ("offline", "error", "timeout")
+
+DEFAULT_POLICY = {
+    "enabled": True,
+    "max_interval": 300,
+    "stretch_factor": 1.5,
+    "stable_checks": 3,
+    "confirm_interval": 2,
+    "confirm_retries": 2
+}
+
+
+class AdaptivePolicy:
+    """Paramètres de la politique adaptative (section settings.adaptive de config.json)"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        options = {**DEFAULT_POLICY, **(settings or {})}
+        self.enabled = bool(options["enabled"])
+        self.max_interval = float(options["max_interval"])
+        self.stretch_factor = max(float(options["stretch_factor"]), 1.0)
+        self.stable_checks = max(int(options["stable_checks"]), 1)
+        self.confirm_interval = float(options["confirm_interval"])
+        self.confirm_retries = max(int(options["confirm_retries"]), 0)
+
+    def for_probe(self, probe: Dict[str, Any]) -> 'AdaptivePolicy':
+        """Applique les surcharges éventuelles définies dans la sonde (clé "adaptive")"""
+        overrides = probe.get("adaptive")
+        if not overrides:
+            return self
+        return AdaptivePolicy({**self.__dict__, **overrides})
+
+
+class ProbeSchedule:
+    """État de planification d'une sonde"""
+
+    __slots__ = ('base_interval', 'interval', 'next_check', 'stable_count', 'confirming', 'pending_status')
+
+    def __init__(self, base_interval: float, now: float):
+        self.base_interval = base_interval
+        self.interval = base_interval
+        self.next_check = now
+        self.stable_count = 0
+        self.confirming = 0
+        self.pending_status = None
+
+    def reset(self, now: float):
+        self.interval = self.base_interval
+        self.stable_count = 0
+        self.confirming = 0
+        self.pending_status = None
+        self.next_check = now + self.interval
+
+    def on_result(self, policy: AdaptivePolicy, previous: Optional[str], new: str, now: float) -> str:
+        """Met à jour la planification et indique quoi faire du résultat
+
+        Retourne "record" (transition à enregistrer), "confirming" (échec à
+        confirmer, rien à enregistrer), "false_positive" (l'échec n'a pas été
+        confirmé) ou "stable".
+        """
+        if not policy.enabled:
+            self.next_check = now + self.base_interval
+            return "stable" if previous == new else "record"
+
+        if previous is None:
+            self.reset(now)
+            return "record"
+
+        if new == previous:
+            outcome = "false_positive" if self.confirming else "stable"
+            if self.confirming:
+                self.reset(now)
+            else:
+                self.stable_count += 1
+                if self.stable_count >= policy.stable_checks:
+                    self.interval = min(self.interval * policy.stretch_factor,
+                                        max(policy.max_interval, self.base_interval))
+            self.next_check = now + self.interval
+            return outcome
+
+        if new in FAILURE_STATUSES and previous not in FAILURE_STATUSES and policy.confirm_retries:
+            if not self.confirming:
+                self.confirming = policy.confirm_retries
+                self.pending_status = new
+                self.next_check = now + policy.confirm_interval
+                return "confirming"
+            self.confirming -= 1
+            if self.confirming:
+                self.next_check = now + policy.confirm_interval
+                return "confirming"
+
+        self.reset(now)
+        return "record"
@@ -0,0 +1,247 @@
+"""Mode simulation (rejeu) du moteur de monitoring.
+
+Le vrai moteur (planification adaptative, confirmations, historique,
+changement de jour, rétention, instantané) tourne sur une horloge simulée
+avec des résultats de sondes scriptés : aucune requête réseau, aucune
+attente. Le temps saute directement à la prochaine échéance, ce qui
+permet de produire des semaines d'historique en quelques secondes et
+d'obtenir des mesures reproductibles (même graine, même résultat).
+
+Exemple :
+    python simulation.py --probes 1000 --days 30 --interval 3600 \\
+        --history-backend sqlite --output /tmp/uptimecore-sim
+
+Sans --history-interval, les sauvegardes périodiques de l'historique
+suivent l'intervalle de vérification (ici une entrée par sonde et par
+heure, environ 720 000 entrées).
+
+Le dossier de sortie reçoit un config.json généré et le dossier history/
+rempli ; il peut ensuite servir de racine de projet pour interroger
+l'historique simulé.
+"""
+import argparse
+import bisect
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from api import MonitoringService
+from clock import SimulatedClock
+from results import parse_timestamp_ms
+
+logger = logging.getLogger(__name__)
+
+PROBE_TYPES = ("http", "ping", "tcp", "dns")
+
+
+class ScriptedOutcomes:
+    """Résultats scriptés et reproductibles, appelés à la place des vérifications réelles
+
+    - aléatoire : à chaque vérification, une panne démarre avec la
+      probabilité `failure_rate` et dure en moyenne `mean_outage`
+      vérifications ; latence gaussienne (`latency_mean`, `latency_jitter`).
+      Chaque sonde a son propre générateur, dérivé de la graine.
+    - chronologie : {probe_id: [[horodatage ISO, statut], ...]} impose le
+      statut à partir de chaque horodatage (prioritaire sur l'aléatoire).
+    """
+
+    def __init__(self, seed: int = 0, failure_rate: float = 0.002, mean_outage: float = 3.0,
+                 latency_mean: float = 40.0, latency_jitter: float = 10.0,
+                 timeline: Optional[Dict[str, List[List[str]]]] = None):
+        self.seed = seed
+        self.failure_rate = failure_rate
+        self.mean_outage = mean_outage
+        self.latency_mean = latency_mean
+        self.latency_jitter = latency_jitter
+        self.timeline = {}
+        for probe_id, segments in (timeline or {}).items():
+            ordered = sorted((parse_timestamp_ms(start), status) for start, status in segments)
+            self.timeline[probe_id] = ([start for start, _ in ordered], [status for _, status in ordered])
+        self.generators: Dict[str, random.Random] = {}
+        self.outages: Dict[str, int] = {}
+        self.checks = 0
+
+    def scripted_status(self, probe_id: str, timestamp_ms: int) -> Optional[str]:
+        segments = self.timeline.get(probe_id)
+        if not segments:
+            return None
+        index = bisect.bisect_right(segments[0], timestamp_ms) - 1
+        return segments[1][index] if index >= 0 else None
+
+    def __call__(self, probe: Dict[str, Any], timestamp_ms: int) -> Dict[str, Any]:
+        self.checks += 1
+        probe_id = probe['id']
+        rng = self.generators.get(probe_id)
+        if rng is None:
+            rng = self.generators[probe_id] = random.Random(f"{self.seed}:{probe_id}")
+
+        status = self.scripted_status(probe_id, timestamp_ms)
+        if status is None:
+            remaining = self.outages.get(probe_id, 0)
+            if remaining > 0:
+                self.outages[probe_id] = remaining - 1
+                status = "offline"
+            elif rng.random() < self.failure_rate:
+                self.outages[probe_id] = int(rng.expovariate(1 / self.mean_outage))
+                status = "offline"
+            else:
+                status = "online"
+
+        if status not in ("online", "slow"):
+            return {"status": status, "response_time": None, "error": "Panne simulée"}
+
+        response_time = max(0.1, rng.gauss(self.latency_mean, self.latency_jitter))
+        if status == "online" and response_time > probe.get('threshold', float('inf')):
+            status = "slow"
+        return {"status": status, "response_time": round(response_time, 2), "error": None}
+
+
+def generate_config(probes: int, interval: float, history_backend: str) -> Dict[str, Any]:
+    """Configuration fictive : `probes` sondes de types variés (jamais contactées)"""
+    return {
+        "probes": [
+            {
+                "id": f"sim_{index:04d}",
+                "name": f"Sonde simulée {index}",
+                "type": PROBE_TYPES[index % len(PROBE_TYPES)],
+                "target": f"sim-{index}.example",
+                "port": 443,
+                "interval": interval,
+                "threshold": 100
+            }
+            for index in range(probes)
+        ],
+        "settings": {
+            "history_backend": history_backend,
+            "adaptive": {"enabled": True, "max_interval": max(interval, 300)}
+        }
+    }
+
+
+class Simulation:
+    """Fait tourner un MonitoringService sur une horloge simulée jusqu'à `end`"""
+
+    def __init__(self, service: MonitoringService, clock: SimulatedClock, outcomes: ScriptedOutcomes):
+        self.service = service
+        self.clock = clock
+        self.outcomes = outcomes
+        self.history_entries = 0
+        service.prober = outcomes
+
+        append = service.append_to_history
+
+        def counted_append(entries, operation):
+            self.history_entries += len(entries)
+            append(entries, operation)
+
+        service.append_to_history = counted_append
+
+    def run(self, end: float, progress_every: float = 86400) -> Dict[str, Any]:
+        started = time.perf_counter()
+        simulated_start = self.clock.time()
+        next_progress = simulated_start + progress_every
+        rounds = 0
+
+        while self.clock.time() < end:
+            next_due = self.service.run_round()
+            rounds += 1
+            self.clock.advance_to(min(max(next_due, self.clock.time() + 0.001), end))
+
+            if self.clock.time() >= next_progress:
+                next_progress += progress_every
+                print(f"   {self.clock.now().strftime('%Y-%m-%d %H:%M')} - {self.outcomes.checks} vérifications, "
+                      f"{self.history_entries} entrées ({time.perf_counter() - started:.1f}s)")
+
+        self.service.save_status_snapshot()
+        elapsed = time.perf_counter() - started
+        return {
+            "simulated_seconds": end - simulated_start,
+            "probes": len(self.service.probes),
+            "rounds": rounds,
+            "checks": self.outcomes.checks,
+            "history_entries": self.history_entries,
+            "history_backend": self.service.history_storage.name,
+            "elapsed_seconds": round(elapsed, 3),
+            "speedup": round((end - simulated_start) / elapsed) if elapsed else None
+        }
+
+
+def create_service(output: str, config: Dict[str, Any], start: float, interval: float,
+                   history_interval: Optional[float] = None,
+                   retention_days: Optional[int] = None) -> Tuple[MonitoringService, SimulatedClock]:
+    """Écrit la configuration dans `output` et y prépare un moteur sur horloge simulée"""
+    os.makedirs(os.path.join(output, 'history'), exist_ok=True)
+    config = dict(config)
+    config.pop('notifications', None)  # jamais d'envoi réel depuis une simulation
+    with open(os.path.join(output, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+    clock = SimulatedClock(start)
+    service = MonitoringService(clock=clock, project_root=os.path.abspath(output), autostart=False)
+    service.max_probes = max(service.max_probes, len(config['probes']))
+    service.load_config()
+    service.check_interval = max(service.check_interval, interval)
+    service.snapshot_interval = 3600
+    if history_interval:
+        service.history_interval = history_interval
+    if retention_days:
+        service.history_retention_days = retention_days
+    return service, clock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation accélérée du moteur de monitoring")
+    parser.add_argument('--output', required=True, help="Dossier racine de la simulation (config.json, history/)")
+    parser.add_argument('--config', help="config.json existant à rejouer (sinon sondes générées)")
+    parser.add_argument('--probes', type=int, default=100, help="Nombre de sondes générées")
+    parser.add_argument('--days', type=float, default=7, help="Durée simulée en jours")
+    parser.add_argument('--start', help="Début ISO 8601 (défaut : maintenant - durée)")
+    parser.add_argument('--interval', type=float, default=60, help="Intervalle de vérification des sondes générées (s)")
+    parser.add_argument('--history-interval', type=float, default=None,
+                        help="Intervalle des sauvegardes périodiques (s, défaut : --interval)")
+    parser.add_argument('--history-backend', default='json', choices=('json', 'sqlite'))
+    parser.add_argument('--retention-days', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--failure-rate', type=float, default=0.002)
+    parser.add_argument('--mean-outage', type=float, default=3.0, help="Durée moyenne d'une panne (vérifications)")
+    parser.add_argument('--timeline', help="Fichier JSON {probe_id: [[horodatage ISO, statut], ...]}")
+    parser.add_argument('--verbose', action='store_true', help="Conserver les logs INFO du moteur")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        config.setdefault('settings', {})['history_backend'] = args.history_backend
+    else:
+        config = generate_config(args.probes, args.interval, args.history_backend)
+
+    duration = args.days * 86400
+    start = parse_timestamp_ms(args.start) / 1000 if args.start else time.time() - duration
+    # Une sauvegarde périodique toutes les 60 s (valeur du service) pour des sondes
+    # vérifiées toutes les heures multiplierait le volume d'historique par 60
+    service, clock = create_service(args.output, config, start, args.interval,
+                                    args.history_interval or args.interval, args.retention_days)
+
+    timeline = None
+    if args.timeline:
+        with open(args.timeline, 'r', encoding='utf-8') as f:
+            timeline = json.load(f)
+    outcomes = ScriptedOutcomes(args.seed, args.failure_rate, args.mean_outage, timeline=timeline)
+
+    print(f"🧪 Simulation: {len(service.probes)} sondes, {args.days:g} jours à partir du "
+          f"{clock.now().strftime('%Y-%m-%d %H:%M')} (backend {service.history_storage.name})")
+    report = Simulation(service, clock, outcomes).run(start + duration)
+    service.history_storage.close()
+    service.notifier.stop()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,19 @@
 import os
 import sys
 import time
+import re
+import gzip
 import signal
+import select
+import hashlib
 import threading
 import subprocess
 import requests
 from pathlib import Path
-from flask import Flask, render_template, send_from_directory, jsonify, request, session, redirect, url_for, flash
+from flask import Flask, Response, render_template, send_from_directory, jsonify, request, session, redirect, url_for, flash
 from functools import wraps
 from dotenv import load_dotenv
+from backend import log_config
 import logging
 import secrets
 from datetime import datetime
@@ -17,35 +22,131 @@ import werkzeug.serving
 # Charger les variables d'environnement
 load_dotenv()
 
+# Proxy /api : en-têtes transmis au backend et en-têtes de réponse relayés
+FORWARDED_REQUEST_HEADERS = ('Accept', 'Content-Type', 'Authorization', 'X-Admin-Token')
+RELAYED_RESPONSE_HEADERS = ('Location', 'Retry-After', 'X-Check-Source', 'Content-Disposition', 'X-Profile-Active')
+# Seules routes POST relayées : vérifications manuelles et administration (jeton
+# ADMIN_TOKEN vérifié par le backend). /api/reload et les autres restent internes.
+PROXIED_POST_ROUTES = re.compile(r'(check/[^/]+|admin/.+)')
+
 # Configuration du logging pour le main
 def setup_logging():
-    """Configure le logging avec rotation des fichiers"""
+    """Configure le logging non bloquant (file + thread d'écriture) avec rotation des fichiers"""
     logs_dir = Path(__file__).parent.absolute() / "logs"
     logs_dir.mkdir(exist_ok=True)
     
-    # Fichier de log pour le launcher
-    launcher_log_file = logs_dir / f"launcher_{datetime.now().strftime('%Y%m%d')}.log"
+    # Fichier de log pour le launcher (archives datées et compressées à la rotation)
+    launcher_log_file = logs_dir / "launcher.log"
     
-    # Configuration du logger principal
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(launcher_log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    formatter = log_config.make_formatter()
+    file_handler = log_config.make_file_handler(str(launcher_log_file), formatter)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    # Les logs de Werkzeug/Flask vont uniquement dans le fichier
+    console_handler.addFilter(lambda record: not record.name.startswith('werkzeug'))
     
-    # Supprimer les logs de Werkzeug/Flask de la console
-    werkzeug_logger = logging.getLogger('werkzeug')
-    werkzeug_logger.handlers = []
-    werkzeug_logger.addHandler(logging.FileHandler(launcher_log_file, encoding='utf-8'))
-    werkzeug_logger.setLevel(logging.WARNING)
+    log_config.attach_queue(logging.getLogger(), [file_handler, console_handler])
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
     
     return logging.getLogger('LAUNCHER'), launcher_log_file
 
 logger, launcher_log_file = setup_logging()
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class StaticAsset:
+    """Contenu statique gardé en mémoire avec ses variantes précompressées"""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.hash = hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {'identity': body}
+
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self.variants['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.variants['br'] = compressed
+
+    def select(self, accept_encodings):
+        """Choisit la variante la plus compacte acceptée par le client"""
+        candidates = [enc for enc in ('br', 'gzip') if enc in self.variants and accept_encodings[enc]]
+        if not candidates:
+            return 'identity', self.body
+        encoding = min(candidates, key=lambda enc: len(self.variants[enc]))
+        return encoding, self.variants[encoding]
+
+
+class FrontendAssets:
+    """Mode production : CSS/JS extraits de index.html, empreintes de contenu et précompression
+
+    Les fichiers /assets/app.<hash>.css|js sont immuables (cache d'un an) ;
+    seule la page HTML est revalidée à chaque chargement via son ETag.
+    """
+
+    ASSET_PREFIX = '/assets/'
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    REVALIDATE = 'no-cache'
+
+    def __init__(self, frontend_dir: Path):
+        self.frontend_dir = frontend_dir
+        self.assets = {}
+        self.shell = None
+        self.build()
+
+    def add(self, body: str, extension: str, content_type: str) -> str:
+        asset = StaticAsset(body.encode('utf-8'), content_type)
+        name = f"app.{asset.hash}.{extension}"
+        self.assets[name] = asset
+        return f"{self.ASSET_PREFIX}{name}"
+
+    def build(self):
+        html = (self.frontend_dir / 'index.html').read_text(encoding='utf-8')
+
+        styles = re.findall(r'<style>(.*?)</style>', html, flags=re.DOTALL)
+        if styles:
+            href = self.add('\n'.join(styles), 'css', 'text/css; charset=utf-8')
+            html = re.sub(r'\s*<style>.*?</style>', '', html, flags=re.DOTALL)
+            html = html.replace('</head>', f'    <link rel="stylesheet" href="{href}">\n</head>', 1)
+
+        def externalize(match):
+            src = self.add(match.group(1), 'js', 'application/javascript; charset=utf-8')
+            return f'<script src="{src}"></script>'
+
+        html = re.sub(r'<script>(.*?)</script>', externalize, html, flags=re.DOTALL)
+        self.shell = StaticAsset(html.encode('utf-8'), 'text/html; charset=utf-8')
+
+        total = sum(len(a.body) for a in self.assets.values()) + len(self.shell.body)
+        compressed = sum(len(a.select({'br': 1, 'gzip': 1})[1]) for a in [*self.assets.values(), self.shell])
+        logger.info(f"📦 Assets frontend construits: {', '.join(self.assets)} "
+                    f"({total} octets, {compressed} compressés)")
+
+    def respond(self, asset: StaticAsset, cache_control: str):
+        encoding, body = asset.select(request.accept_encodings)
+        response = Response(body, content_type=asset.content_type)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = cache_control
+        response.set_etag(f"{asset.hash}-{encoding}")
+        return response.make_conditional(request)
+
+    def index(self):
+        return self.respond(self.shell, self.REVALIDATE)
+
+    def asset(self, name: str):
+        asset = self.assets.get(name)
+        if asset is None:
+            return jsonify({"error": "Asset introuvable"}), 404
+        return self.respond(asset, self.IMMUTABLE)
+
 
 class MonitoringLauncher:
     def __init__(self):
@@ -62,18 +163,30 @@ class MonitoringLauncher:
         self.flask_port = int(os.getenv('FLASK_PORT'))
         self.flask_debug = os.getenv('FLASK_DEBUG')
         
-        self.ping_thread = None
-        self.stop_ping = False
+        # Supervision du backend : disponibilité signalée par un pipe hérité,
+        # redémarrage avec backoff exponentiel et limite de boucle de crash
+        self.supervisor_thread = None
+        self.stopping = threading.Event()
+        self.backend_ready = False
+        self.backend_started_at = None
+        self.backend_restarts = 0
+        self.ready_timeout = float(os.getenv('BACKEND_READY_TIMEOUT', 15))
+        self.restart_delay = 0.1
+        self.restart_max_delay = 30
+        self.stable_uptime = 60
+        self.crash_loop_window = 60
+        self.crash_loop_max_restarts = 5
         self.app = Flask(__name__)
         
-        # État pour éviter le spam des logs
-        self.last_api_status = None  # True=online, False=offline, None=unknown
-        self.api_status_changed = False
-        
         # Configuration Flask
         self.app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
         self.app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Pas de cache en dev
         
+        # Assets empreintés et précompressés (FRONTEND_ASSETS=dev pour servir index.html tel quel)
+        self.frontend_assets = None
+        if os.getenv('FRONTEND_ASSETS', 'production').lower() != 'dev':
+            self.frontend_assets = FrontendAssets(self.frontend_dir)
+        
         # Créer les dossiers nécessaires
         self.setup_directories()
         
@@ -85,8 +198,13 @@ class MonitoringLauncher:
         for directory in [self.logs_dir, self.history_dir]:
             directory.mkdir(exist_ok=True)
             
-        # Créer le fichier de log de l'API s'il n'existe pas
-        self.backend_log_file = self.logs_dir / f"api_{datetime.now().strftime('%Y%m%d')}.log"
+        # Sortie de l'API relayée vers un fichier avec rotation
+        self.backend_log_file = self.logs_dir / "api.log"
+        self.backend_logger = logging.getLogger('API')
+        self.backend_logger.propagate = False
+        log_config.attach_queue(self.backend_logger, [
+            log_config.make_file_handler(str(self.backend_log_file), logging.Formatter('%(message)s'))
+        ])
         logger.info(f"📝 Logs de l'API: {self.backend_log_file}")
         logger.info(f"📝 Logs du serveur: {launcher_log_file}")
         logger.info(f"📁 Dossier history: {self.history_dir}")
@@ -106,47 +224,178 @@ class MonitoringLauncher:
         except Exception as e:
             return False, str(e)
     
-    def continuous_ping(self):
-        """Thread qui ping l'API en continu"""
-        logger.info("🔄 Démarrage du monitoring de l'API backend")
+    def wait_ready(self, read_fd: int, timeout: float) -> bool:
+        """Attend le message READY du backend sur le pipe (EOF = processus terminé)"""
+        deadline = time.monotonic() + timeout
+        buffer = b""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([read_fd], [], [], remaining)
+            if not readable:
+                return False
+            chunk = os.read(read_fd, 64)
+            if not chunk:
+                return False
+            buffer += chunk
+            if buffer.startswith(b"READY"):
+                return True
+    
+    def poll_ready(self, timeout: float) -> bool:
+        """Repli sans pipe hérité (Windows) : interrogation rapide de /api/health"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.backend_process.poll() is not None:
+                return False
+            is_online, _ = self.ping_backend_api()
+            if is_online:
+                return True
+            time.sleep(0.05)
+        return False
+    
+    def spawn_backend(self) -> bool:
+        """Lance le processus backend et attend qu'il signale sa disponibilité"""
+        backend_file = self.backend_dir / "api.py"
+        cmd = [sys.executable, str(backend_file)]
+        
+        logger.info(f"🚀 Démarrage du backend: {' '.join(cmd)}")
         
-        consecutive_failures = 0
+        # Écrire un séparateur dans le log de l'API
+        self.log_backend_banner("DÉMARRAGE API")
         
-        while not self.stop_ping:
-            is_online, result = self.ping_backend_api()
+        use_pipe = os.name == 'posix'
+        env = dict(os.environ)
+        popen_options = {}
+        if use_pipe:
+            read_fd, write_fd = os.pipe()
+            env['UPTIMECORE_READY_FD'] = str(write_fd)
+            popen_options['pass_fds'] = (write_fd,)
+        
+        start = time.monotonic()
+        try:
+            try:
+                self.backend_process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                    bufsize=1,
+                    cwd=str(self.backend_dir),
+                    encoding='utf-8',
+                    errors='replace',
+                    env=env,
+                    **popen_options
+                )
+            finally:
+                if use_pipe:
+                    os.close(write_fd)
             
-            # Vérifier si le statut a changé
-            status_changed = self.last_api_status != is_online
+            threading.Thread(
+                target=self.pump_backend_output,
+                args=(self.backend_process,),
+                name='BackendOutput',
+                daemon=True
+            ).start()
             
-            if is_online:
-                if status_changed:
-                    if consecutive_failures > 0:
-                        logger.info(f"🟢 API Backend RÉCUPÉRÉE après {consecutive_failures} échecs - {result}")
-                    else:
-                        logger.info(f"🟢 API Backend ONLINE - {result}")
-                consecutive_failures = 0
+            if use_pipe:
+                ready = self.wait_ready(read_fd, self.ready_timeout)
+            else:
+                ready = self.poll_ready(self.ready_timeout)
+        finally:
+            # Fermé aussi si Popen échoue (OSError)
+            if use_pipe:
+                os.close(read_fd)
+        
+        if not ready:
+            if self.backend_process.poll() is None:
+                logger.error(f"❌ Backend non disponible après {self.ready_timeout}s, arrêt du processus")
+                self.backend_process.kill()
+                self.backend_process.wait()
             else:
-                consecutive_failures += 1
-                if status_changed or consecutive_failures == 1:
-                    logger.warning(f"🔴 API Backend OFFLINE - {result}")
-                elif consecutive_failures % 10 == 0:  # Log toutes les 10 tentatives (2.5 minutes)
-                    logger.warning(f"🔴 API Backend toujours OFFLINE après {consecutive_failures} tentatives - {result}")
+                logger.error(f"❌ Backend terminé avec le code: {self.backend_process.returncode}")
+            self.log_backend_tail()
+            return False
+        
+        self.backend_started_at = time.monotonic()
+        self.backend_ready = True
+        logger.info(f"✅ API Backend prête en {(time.monotonic() - start) * 1000:.0f} ms (pid {self.backend_process.pid})")
+        return True
+    
+    def log_backend_banner(self, title: str):
+        self.backend_logger.info(f"\n{'='*60}\n{title} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n{'='*60}")
+    
+    def pump_backend_output(self, process: subprocess.Popen):
+        """Relaie la sortie du backend vers la file de logs (écriture et rotation hors de ce thread)"""
+        for line in process.stdout:
+            self.backend_logger.info(line.rstrip('\n'))
+        process.stdout.close()
+    
+    def log_backend_tail(self, lines_count: int = 10):
+        """Affiche les dernières lignes du log du backend pour diagnostiquer"""
+        try:
+            with open(self.backend_log_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+                if lines:
+                    logger.error("Dernières lignes du log:")
+                    for line in lines[-lines_count:]:
+                        logger.error(f"  {line.strip()}")
+        except Exception:
+            pass
+    
+    def supervise_backend(self):
+        """Thread qui attend la fin du backend (wait) et le redémarre si besoin"""
+        logger.info("🔄 Supervision du backend démarrée")
+        
+        delay = self.restart_delay
+        recent_restarts = []
+        spawn_failed = False
+        
+        while not self.stopping.is_set():
+            # Après un échec de lancement, il n'y a pas de processus à attendre
+            if not spawn_failed:
+                process = self.backend_process
+                if process is None:
+                    break
                 
-                # Vérifier si le processus backend est toujours en vie
-                if self.backend_process and self.backend_process.poll() is not None:
-                    logger.error(f"💀 Processus backend terminé avec le code: {self.backend_process.returncode}")
+                returncode = process.wait()
+                self.backend_ready = False
+                if self.stopping.is_set():
                     break
+                
+                uptime = time.monotonic() - (self.backend_started_at or time.monotonic())
+                logger.error(f"💀 Processus backend terminé avec le code: {returncode} (après {uptime:.1f}s)")
+                
+                # Un backend resté stable assez longtemps repart avec le délai minimal
+                if uptime >= self.stable_uptime:
+                    delay = self.restart_delay
+            spawn_failed = False
             
-            # Mettre à jour le statut
-            self.last_api_status = is_online
+            now = time.monotonic()
+            recent_restarts = [t for t in recent_restarts if now - t < self.crash_loop_window]
+            if len(recent_restarts) >= self.crash_loop_max_restarts:
+                logger.critical(
+                    f"🛑 Boucle de crash détectée ({len(recent_restarts)} redémarrages en "
+                    f"{self.crash_loop_window}s), abandon des redémarrages")
+                break
+            recent_restarts.append(now)
             
-            # Attendre 15 secondes avant le prochain ping
-            for _ in range(150):  # 150 * 0.1 = 15 secondes
-                if self.stop_ping:
-                    break
-                time.sleep(0.1)
+            if self.stopping.wait(delay):
+                break
+            
+            self.backend_restarts += 1
+            logger.warning(f"♻️  Redémarrage du backend (#{self.backend_restarts}, délai {delay:.2f}s)")
+            self.backend_started_at = None
+            try:
+                if self.spawn_backend():
+                    logger.info("🟢 API Backend RÉCUPÉRÉE après redémarrage")
+            except Exception as e:
+                # Compté comme une tentative : backoff et détection de boucle de crash
+                logger.error(f"❌ Impossible de relancer le backend: {e}")
+                spawn_failed = True
+            delay = min(delay * 2, self.restart_max_delay)
         
-        logger.info("🛑 Arrêt du monitoring de l'API backend")
+        logger.info("🛑 Arrêt de la supervision du backend")
     
     def setup_routes(self):
         """Configure les routes Flask"""
@@ -154,37 +403,77 @@ class MonitoringLauncher:
         @self.app.route('/')
         def index():
             """Serve la page principale"""
+            if self.frontend_assets is not None:
+                return self.frontend_assets.index()
             return send_from_directory(self.frontend_dir, 'index.html')
         
+        @self.app.route('/assets/<name>')
+        def frontend_assets(name):
+            """Serve les assets empreintés (cache immuable)"""
+            if self.frontend_assets is None:
+                return jsonify({"error": "Assets désactivés (FRONTEND_ASSETS=dev)"}), 404
+            return self.frontend_assets.asset(name)
+        
         @self.app.route('/frontend/<path:filename>')
         def frontend_files(filename):
             """Serve les fichiers statiques du frontend"""
             return send_from_directory(self.frontend_dir, filename)
         
-        @self.app.route('/api/<path:path>')
+        @self.app.route('/api/<path:path>', methods=['GET', 'POST'])
         def proxy_api(path):
             """Proxy vers l'API backend"""
+            if request.method == 'POST' and not PROXIED_POST_ROUTES.fullmatch(path):
+                logger.warning(f"⛔ POST /api/{path} refusé par le proxy")
+                return jsonify({"error": "Méthode non autorisée via le launcher"}), 405
+            
             try:
-                # Vérifier d'abord si l'API est en ligne
-                is_online, _ = self.ping_backend_api()
-                if not is_online:
+                # L'état du processus est suivi par le superviseur, pas besoin de ping préalable
+                if not self.backend_ready:
                     logger.error("🔴 Tentative de proxy vers API offline")
                     return jsonify({"error": "API backend non disponible"}), 503
                 
                 # Forwarder la requête vers l'API backend
                 backend_url = f"{self.backend_url}/api/{path}"
                 
-                if hasattr(request, 'args'):
-                    params = request.args.to_dict()
-                    response = requests.get(backend_url, params=params, timeout=10)
-                else:
-                    response = requests.get(backend_url, timeout=10)
-                
-                return jsonify(response.json())
+                # En-têtes utiles au backend : négociation, corps, authentification admin
+                headers = {header: request.headers[header] for header in FORWARDED_REQUEST_HEADERS
+                           if request.headers.get(header)}
+
+                # Une vérification manuelle synchrone peut durer plus longtemps que la lecture
+                timeout = 30 if request.method == 'POST' else 10
+                response = requests.request(request.method, backend_url,
+                                            params=list(request.args.items(multi=True)),
+                                            data=request.get_data() or None,
+                                            headers=headers, timeout=timeout, stream=True)
+
+                # Les réponses NDJSON sont relayées au fil de l'eau
+                content_type = response.headers.get('Content-Type', '')
+                if content_type.startswith('application/x-ndjson'):
+                    return Response(response.iter_content(chunk_size=None), status=response.status_code,
+                                    content_type=content_type)
+
+                # Corps relayé tel quel (JSON, ou texte comme le résultat du profilage)
+                relayed = Response(response.content, status=response.status_code,
+                                   content_type=content_type or 'application/json')
+                for header in RELAYED_RESPONSE_HEADERS:
+                    if header in response.headers:
+                        relayed.headers[header] = response.headers[header]
+                return relayed
             except Exception as e:
                 logger.error(f"Erreur proxy API: {e}")
                 return jsonify({"error": "API backend non disponible"}), 503
         
+        @self.app.route('/metrics')
+        def metrics_proxy():
+            """Relaie les métriques Prometheus du backend"""
+            try:
+                response = requests.get(f"{self.backend_url}/metrics", timeout=5)
+                return Response(response.content, status=response.status_code,
+                                content_type=response.headers.get('Content-Type', 'text/plain'))
+            except Exception as e:
+                logger.error(f"Erreur proxy métriques: {e}")
+                return jsonify({"error": "API backend non disponible"}), 503
+
         @self.app.route('/health')
         def health():
             """Point de santé du service principal"""
@@ -196,7 +485,8 @@ class MonitoringLauncher:
                 "backend": {
                     "status": "online" if backend_online else "offline",
                     "info": backend_info,
-                    "process": "running" if self.backend_process else "stopped"
+                    "process": "running" if self.backend_ready else "stopped",
+                    "restarts": self.backend_restarts
                 },
                 "config": {
                     "backend_url": self.backend_url,
@@ -207,7 +497,7 @@ class MonitoringLauncher:
         
     
     def start_backend(self):
-        """Lance le processus backend"""
+        """Lance le processus backend puis sa supervision"""
         backend_file = self.backend_dir / "api.py"
         
         if not backend_file.exists():
@@ -216,85 +506,16 @@ class MonitoringLauncher:
             return False
         
         try:
-            # Test d'abord si le fichier peut être compilé
-            test_result = subprocess.run(
-                [sys.executable, "-m", "py_compile", str(backend_file)],
-                capture_output=True,
-                text=True
-            )
-            
-            if test_result.returncode != 0:
-                logger.error(f"❌ Erreur de compilation dans api.py:")
-                logger.error(test_result.stderr)
+            if not self.spawn_backend():
                 return False
             
-            # Lancer le backend avec les logs redirigés vers un fichier
-            cmd = [sys.executable, str(backend_file)]
-            
-            logger.info(f"🚀 Démarrage du backend: {' '.join(cmd)}")
-            
-            # Ouvrir le fichier de log en mode append
-            log_file = open(self.backend_log_file, 'a', encoding='utf-8')
-            
-            # Écrire un séparateur dans le fichier de log
-            log_file.write(f"\n{'='*60}\n")
-            log_file.write(f"DÉMARRAGE API - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            log_file.write(f"{'='*60}\n")
-            log_file.flush()
-            
-            self.backend_process = subprocess.Popen(
-                cmd,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,
-                cwd=str(self.backend_dir),
-                encoding='utf-8',
-                errors='replace'
+            self.supervisor_thread = threading.Thread(
+                target=self.supervise_backend,
+                name='backend-supervisor',
+                daemon=True
             )
-            
-            # Garder une référence au fichier de log pour pouvoir le fermer plus tard
-            self.backend_log_file_handle = log_file
-            
-            # Attendre un peu pour vérifier que le backend démarre
-            time.sleep(3)
-            
-            if self.backend_process.poll() is not None:
-                logger.error(f"❌ Backend terminé avec le code: {self.backend_process.returncode}")
-                # Lire les dernières lignes du fichier de log pour diagnostiquer
-                try:
-                    with open(self.backend_log_file, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        if lines:
-                            logger.error("Dernières lignes du log:")
-                            for line in lines[-10:]:  # Afficher les 10 dernières lignes
-                                logger.error(f"  {line.strip()}")
-                except:
-                    pass
-                return False
-            
-            # Test ping pour vérifier que l'API répond
-            logger.info("🔍 Test de connexion à l'API backend...")
-            max_attempts = 10
-            for attempt in range(max_attempts):
-                is_online, result = self.ping_backend_api()
-                if is_online:
-                    logger.info(f"✅ API Backend accessible - {result}")
-                    
-                    # Démarrer le monitoring continu
-                    self.ping_thread = threading.Thread(
-                        target=self.continuous_ping,
-                        daemon=True
-                    )
-                    self.ping_thread.start()
-                    
-                    return True
-                else:
-                    logger.info(f"⏳ Tentative {attempt + 1}/{max_attempts} - API non disponible: {result}")
-                    time.sleep(1)
-            
-            logger.error("❌ L'API backend ne répond pas après le démarrage")
-            return False
+            self.supervisor_thread.start()
+            return True
                 
         except Exception as e:
             logger.error(f"Erreur lors du démarrage du backend: {e}")
@@ -302,24 +523,16 @@ class MonitoringLauncher:
     
     def stop_backend(self):
         """Arrête le processus backend"""
-        # Arrêter le ping
-        self.stop_ping = True
-        if self.ping_thread:
-            self.ping_thread.join(timeout=2)
+        # Arrêter la supervision (pas de redémarrage pendant l'arrêt)
+        self.stopping.set()
+        self.backend_ready = False
         
         # Arrêter le backend
         if self.backend_process:
             logger.info("🛑 Arrêt du backend...")
             
             # Écrire un message d'arrêt dans le log
-            try:
-                if hasattr(self, 'backend_log_file_handle'):
-                    self.backend_log_file_handle.write(f"\n{'='*60}\n")
-                    self.backend_log_file_handle.write(f"ARRÊT API - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    self.backend_log_file_handle.write(f"{'='*60}\n")
-                    self.backend_log_file_handle.flush()
-            except:
-                pass
+            self.log_backend_banner("ARRÊT API")
             
             self.backend_process.terminate()
             
@@ -331,12 +544,8 @@ class MonitoringLauncher:
                 self.backend_process.kill()
                 self.backend_process.wait()
             
-            # Fermer le fichier de log
-            try:
-                if hasattr(self, 'backend_log_file_handle'):
-                    self.backend_log_file_handle.close()
-            except:
-                pass
+            if self.supervisor_thread:
+                self.supervisor_thread.join(timeout=2)
             
             self.backend_process = None
             logger.info("✅ Backend arrêté")
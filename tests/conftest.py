@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Les modules du backend s'importent entre eux comme modules de premier niveau
+# (api.py est lancé depuis backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+# Si un test crée le service global de api.py, il ne doit pas démarrer
+os.environ.setdefault('UPTIMECORE_SIMULATION', '1')
@@ -0,0 +1,48 @@
+"""Routes d'administration : jeton et validation des paramètres."""
+import pytest
+
+from profiling import tracer
+
+TOKEN = 'test-token'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import api
+
+    monkeypatch.setenv('ADMIN_TOKEN', TOKEN)
+    enabled, capacity = tracer.enabled, tracer.spans.maxlen
+    yield api.app.test_client()
+    tracer.configure(enabled, capacity)
+
+
+def test_admin_routes_require_token(client):
+    assert client.get('/api/admin/trace').status_code == 401
+    assert client.get('/api/admin/trace', headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get('/api/admin/trace', headers={"Authorization": f"Bearer {TOKEN}"}).status_code == 200
+
+
+@pytest.mark.parametrize('capacity', [-1, 0, 'abc', [10], {"n": 1}])
+def test_trace_capacity_must_be_positive_integer(client, capacity):
+    before = tracer.spans.maxlen
+
+    response = client.post('/api/admin/trace', json={"capacity": capacity}, headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Paramètre invalide')
+    assert tracer.spans.maxlen == before
+
+
+def test_trace_configure(client):
+    response = client.post('/api/admin/trace', json={"enabled": True, "capacity": "50"},
+                           headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert response.get_json()["capacity"] == 50
+    assert tracer.enabled is True
+
+
+def test_profile_start_rejects_invalid_seconds(client):
+    response = client.post('/api/admin/profile/start', json={"seconds": [1]}, headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+"""Paramètres des routes d'historique : valeurs invalides refusées en 400."""
+import json
+
+import pytest
+
+PROBES = [{"id": "web", "name": "Web", "type": "http", "target": "http://example.test"}]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import api
+
+    with open(tmp_path / 'config.json', 'w', encoding='utf-8') as f:
+        json.dump({"probes": PROBES, "settings": {}}, f)
+    service = api.MonitoringService(project_root=str(tmp_path), autostart=False)
+    monkeypatch.setattr(api, 'monitoring_service', service)
+    yield api.app.test_client()
+    service.stop_monitoring()
+    service.history_storage.close()
+
+
+@pytest.mark.parametrize('query', [
+    'days=abc', 'days=0', 'days=-3', 'days=99999999',
+    'days=abc&limit=10', 'days=-1&order=asc',
+    'date=2026-13-01', 'limit=0', 'from=hier'
+])
+def test_invalid_history_params_are_rejected(client, query):
+    response = client.get(f'/api/history/web?{query}')
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Paramètre invalide')
+
+
+@pytest.mark.parametrize('query', ['', 'days=3', 'days=3&limit=10', 'date=2026-01-05'])
+def test_valid_history_params(client, query):
+    assert client.get(f'/api/history/web?{query}').status_code == 200
+
+
+@pytest.mark.parametrize('query', ['hours=abc', 'hours=1e300', 'from=2026-01-06&to=2026-01-05'])
+def test_invalid_sparkline_params_are_rejected(client, query):
+    assert client.get(f'/api/sparklines?{query}').status_code == 400
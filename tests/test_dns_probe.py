@@ -0,0 +1,149 @@
+"""Sondes DNS contre un serveur DNS local (stub UDP sur 127.0.0.1)."""
+import socket
+import struct
+import threading
+
+import pytest
+
+from dns_probe import HEADER, DnsMultiplexer, read_name
+
+
+class StubDnsServer:
+    """Répond selon le nom demandé :
+
+    - missing.test : NXDOMAIN
+    - drop.test : aucune réponse
+    - spoof.test : réponse usurpée (mauvais txid) avant la vraie
+    - other.test : réponse portant une autre question
+    - tout autre nom : A 10.0.0.1
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.names = []
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def answer(txid: int, question: bytes, address: bytes, rcode: int = 0) -> bytes:
+        flags = 0x8180 | rcode
+        if rcode:
+            return HEADER.pack(txid, flags, 1, 0, 0, 0) + question
+        record = b'\xc0\x0c' + struct.pack('!HHIH', 1, 1, 60, len(address)) + address
+        return HEADER.pack(txid, flags, 1, 1, 0, 0) + question + record
+
+    def serve(self):
+        while not self.stopping.is_set():
+            try:
+                data, client = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            txid = HEADER.unpack_from(data)[0]
+            name, offset = read_name(data, HEADER.size)
+            question = data[HEADER.size:offset + 4]
+            self.names.append(name)
+
+            if name == 'drop.test':
+                continue
+            if name == 'missing.test':
+                self.sock.sendto(self.answer(txid, question, b'', rcode=3), client)
+                continue
+            if name == 'spoof.test':
+                self.sock.sendto(self.answer(txid ^ 1, question, bytes([6, 6, 6, 6])), client)
+            if name == 'other.test':
+                question = b'\x05other\x07example\x00' + question[-4:]
+            self.sock.sendto(self.answer(txid, question, bytes([10, 0, 0, 1])), client)
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join(timeout=1)
+        self.sock.close()
+
+
+@pytest.fixture
+def stub():
+    server = StubDnsServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def multiplexer():
+    dns = DnsMultiplexer()
+    yield dns
+    dns.close()
+
+
+def query(stub, name, timeout=1.0, record_type='A'):
+    return {"name": name, "record_type": record_type, "server": '127.0.0.1', "port": stub.port, "timeout": timeout}
+
+
+def test_answer_and_rcode(stub, multiplexer):
+    ok, missing = multiplexer.query_many([query(stub, 'ok.test'), query(stub, 'missing.test')])
+
+    assert ok['error'] is None
+    assert ok['rcode'] == 'NOERROR'
+    assert ok['answers'] == [{"type": "A", "value": "10.0.0.1"}]
+    assert ok['latency_us'] > 0
+    assert missing['rcode'] == 'NXDOMAIN'
+    assert missing['answers'] == []
+
+
+def test_spoofed_txid_is_ignored(stub, multiplexer):
+    result, = multiplexer.query_many([query(stub, 'spoof.test')])
+
+    assert result['error'] is None
+    assert [a['value'] for a in result['answers']] == ['10.0.0.1']
+
+
+def test_other_question_and_silence_time_out(stub, multiplexer):
+    other, dropped, ok = multiplexer.query_many([
+        query(stub, 'other.test', timeout=0.3),
+        query(stub, 'drop.test', timeout=0.3),
+        query(stub, 'ok.test', timeout=0.3)
+    ])
+
+    assert other['error'] == 'Timeout'
+    assert dropped['error'] == 'Timeout'
+    assert ok['error'] is None
+
+
+def test_internationalized_name(stub, multiplexer):
+    result, = multiplexer.query_many([query(stub, 'Bücher.example')])
+
+    assert stub.names == ['xn--bcher-kva.example']
+    assert result['error'] is None
+    assert result['rcode'] == 'NOERROR'
+
+
+def test_probe_status(stub, tmp_path):
+    from api import MonitoringService
+
+    service = MonitoringService(project_root=str(tmp_path), autostart=False)
+    try:
+        target = f"127.0.0.1:{stub.port}"
+        probes = [
+            {"id": "ok", "type": "dns", "target": target, "query": "ok.test", "threshold": 1000},
+            {"id": "answer", "type": "dns", "target": target, "query": "ok.test", "expected_answer": "10.0.0.2"},
+            {"id": "rcode", "type": "dns", "target": target, "query": "missing.test"},
+            {"id": "nxdomain", "type": "dns", "target": target, "query": "missing.test", "expected_rcode": "nxdomain"},
+            {"id": "timeout", "type": "dns", "target": target, "query": "drop.test", "timeout": 0.3}
+        ]
+        results = dict(zip((p['id'] for p in probes), service.dns_checks(probes)))
+    finally:
+        service.dns.close()
+        service.notifier.stop()
+        service.manual_checks.stop()
+        service.history_storage.close()
+
+    assert results['ok']['status'] == 'online'
+    assert results['answer']['status'] == 'error'
+    assert results['answer']['error'].startswith('Réponse inattendue')
+    assert results['rcode']['status'] == 'error'
+    assert results['rcode']['error'] == 'RCODE NXDOMAIN (attendu: NOERROR)'
+    assert results['nxdomain']['status'] == 'online'
+    assert results['timeout']['status'] == 'timeout'
@@ -0,0 +1,60 @@
+"""Sous-échantillonnage des mini-graphiques (LTTB et intervalles de statut)."""
+import math
+
+import pytest
+
+from downsampling import StatusBuckets, lttb
+
+
+def series(length):
+    xs = [float(i) for i in range(length)]
+    ys = [math.sin(i / 10) * 100 + 200 for i in range(length)]
+    return xs, ys
+
+
+@pytest.mark.parametrize('length,threshold', [(1000, 100), (1000, 3), (101, 50), (10, 9)])
+def test_output_size_and_endpoints(length, threshold):
+    xs, ys = series(length)
+
+    sampled_x, sampled_y = lttb(xs, ys, threshold)
+
+    assert len(sampled_x) == len(sampled_y) == threshold
+    assert (sampled_x[0], sampled_y[0]) == (xs[0], ys[0])
+    assert (sampled_x[-1], sampled_y[-1]) == (xs[-1], ys[-1])
+    # Points choisis parmi ceux d'origine, dans l'ordre
+    assert sampled_x == sorted(set(sampled_x))
+    assert all(ys[int(x)] == y for x, y in zip(sampled_x, sampled_y))
+
+
+def test_spike_is_kept():
+    xs = [float(i) for i in range(500)]
+    ys = [10.0] * 500
+    ys[123] = 5000.0
+
+    sampled_x, sampled_y = lttb(xs, ys, 20)
+
+    assert 123.0 in sampled_x
+    assert max(sampled_y) == 5000.0
+
+
+@pytest.mark.parametrize('threshold', [0, 2, 10, 50])
+def test_short_series_or_tiny_threshold_is_returned_as_is(threshold):
+    xs, ys = series(10)
+
+    sampled_x, sampled_y = lttb(xs, ys, threshold)
+
+    assert sampled_x == xs
+    assert sampled_y == ys
+    assert sampled_x is not xs
+
+
+def test_status_buckets_keep_worst_status():
+    buckets = StatusBuckets(0, 100, 4)
+    for timestamp, status in [(0, "online"), (10, "slow"), (20, "online"),
+                              (30, "offline"), (40, "timeout"),
+                              (60, "mystery"), (70, "online"),
+                              (-1, "offline"), (100, "offline")]:
+        buckets.add(timestamp, status)
+
+    assert buckets.status == ["slow", "offline", "mystery", None]
+    assert buckets.severity == [1, 4, 2, None]
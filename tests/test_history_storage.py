@@ -0,0 +1,236 @@
+"""Backends d'historique sur un dossier temporaire."""
+import errno
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+import pytest
+
+from clock import SimulatedClock
+from history_storage import JsonHistoryStorage, SqliteHistoryStorage, create_storage, decode_cursor, encode_cursor
+from results import iso_timestamp
+
+DAYS = ['2026-01-05', '2026-01-06', '2026-01-07']
+
+
+def entry(probe_id, moment, status='online'):
+    timestamp_ms = int(moment.timestamp() * 1000)
+    return {"id": probe_id, "timestamp": iso_timestamp(timestamp_ms), "timestamp_ms": timestamp_ms,
+            "status": status, "change_type": "periodic_save"}
+
+
+def write_day(history_dir, date, entries):
+    with open(os.path.join(history_dir, f"{date}.json"), 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+
+
+@pytest.fixture
+def json_store(tmp_path):
+    """Trois journées, deux sondes, entrées écrites dans le désordre"""
+    for date in DAYS:
+        day = datetime.fromisoformat(date)
+        entries = [entry(probe_id, day + timedelta(hours=hour))
+                   for hour in (18, 6, 12, 0) for probe_id in ('a', 'b')]
+        write_day(str(tmp_path), date, entries)
+
+    storages = []
+
+    def make(workers):
+        storage = JsonHistoryStorage(str(tmp_path), workers=workers)
+        storages.append(storage)
+        return storage
+
+    yield make
+    for storage in storages:
+        storage.close()
+
+
+def timestamps(entries):
+    return [e['timestamp_ms'] for e in entries]
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('descending', [False, True])
+def test_load_range_orders_entries_across_days(json_store, workers, descending):
+    storage = json_store(workers)
+    start = datetime(2026, 1, 5, 6)
+    end = datetime(2026, 1, 7, 18)
+
+    merged, missing = storage.load_range(['a', 'b', 'c'], start, end, descending=descending)
+
+    assert missing == []
+    assert merged['c'] == []
+    expected = [int((start + timedelta(hours=6 * step)).timestamp() * 1000) for step in range(10)]
+    if descending:
+        expected.reverse()
+    assert timestamps(merged['a']) == expected
+    assert timestamps(merged['b']) == expected
+    assert {e['id'] for e in merged['a']} == {'a'}
+
+
+def test_load_range_timeout_reports_missing_days(json_store, tmp_path):
+    storage = json_store(2)
+    start, end = datetime(2026, 1, 5), datetime(2026, 1, 9)
+    storage.load_range(['a'], start, end)  # démarre les processus du pool
+
+    # Un tube nommé bloque la lecture de cette journée jusqu'à ce qu'on y écrive
+    blocked = os.path.join(str(tmp_path), '2026-01-08.json')
+    os.mkfifo(blocked)
+    try:
+        started = time.monotonic()
+        merged, missing = storage.load_range(['a'], start, end, descending=False, timeout=0.5)
+        elapsed = time.monotonic() - started
+
+        assert missing == ['2026-01-08']
+        assert 0.5 <= elapsed < 5
+        assert len(merged['a']) == 12
+        assert timestamps(merged['a']) == sorted(timestamps(merged['a']))
+    finally:
+        # Débloque le processus resté sur le tube (s'il l'a ouvert) avant close()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                fd = os.open(blocked, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO:
+                    raise
+                time.sleep(0.05)
+                continue
+            os.write(fd, b'[]')
+            os.close(fd)
+            break
+
+
+def test_load_range_after_close_reads_in_caller(json_store):
+    storage = json_store(3)
+    storage.close()
+
+    merged, missing = storage.load_range(['a'], datetime(2026, 1, 5), datetime(2026, 1, 8))
+
+    assert missing == []
+    assert len(merged['a']) == 12
+    assert storage._pool is None
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def filled_storage(request, tmp_path):
+    """Backend rempli jour par jour (horloge simulée), comme le fait le service"""
+    clock = SimulatedClock(datetime(2026, 1, 5).timestamp())
+    storage = create_storage(request.param, str(tmp_path), clock=clock)
+    written = []
+    for date in DAYS:
+        day = datetime.fromisoformat(date)
+        clock.advance_to(day.timestamp())
+        for hour in (0, 6, 12, 18):
+            # Deux entrées de la sonde a à la même milliseconde : départagées par l'ordre d'écriture
+            batch = [entry('a', day + timedelta(hours=hour)),
+                     entry('a', day + timedelta(hours=hour), status='slow'),
+                     entry('b', day + timedelta(hours=hour, minutes=30), status='offline')]
+            batch[0]["http_status"] = 200
+            storage.append(batch, 'periodic_save')
+            written.extend(batch)
+    yield storage, written
+    storage.close()
+
+
+def test_round_trip_by_day(filled_storage):
+    storage, written = filled_storage
+
+    for date in DAYS:
+        expected = [e for e in written if e['timestamp'].startswith(date)]
+        assert storage.get_day(date) == expected
+        assert storage.get_day(date, 'b') == [e for e in expected if e['id'] == 'b']
+    assert storage.get_day('2026-01-08') == []
+
+
+def test_round_trip_range_and_statistics(filled_storage):
+    storage, written = filled_storage
+    start, end = datetime(2026, 1, 5, 6), datetime(2026, 1, 7, 6)
+
+    selected = [e for e in written if e['id'] == 'a' and
+                start.timestamp() * 1000 <= e['timestamp_ms'] < end.timestamp() * 1000]
+    assert storage.get_range('a', start, end) == selected[::-1]
+
+    stats = storage.statistics('a', start, end)
+    assert stats['total_entries'] == len(selected) == 16
+    assert stats['status_distribution'] == {"online": 8, "slow": 8}
+    assert stats['change_types']['periodic_save'] == 16
+
+
+def test_cleanup_removes_older_days(filled_storage):
+    storage, written = filled_storage
+
+    storage.cleanup(datetime(2026, 1, 6))
+
+    assert storage.get_day('2026-01-05') == []
+    assert storage.get_day('2026-01-06') == [e for e in written if e['timestamp'].startswith('2026-01-06')]
+
+
+def read_pages(storage, probe_id, start, end, descending, limit):
+    """Pages successives via un curseur opaque, comme la route de plage"""
+    pages, cursor = [], None
+    while True:
+        after = None
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            storage.check_cursor(after)
+        page = list(islice(storage.iter_range(probe_id, start, end, descending, after), limit))
+        if not page:
+            return pages
+        pages.append([e for _, e in page])
+        cursor = encode_cursor(page[-1][0])
+
+
+@pytest.mark.parametrize('descending', [True, False])
+@pytest.mark.parametrize('limit', [1, 3, 7, 100])
+def test_cursor_pages_join_to_full_range(filled_storage, descending, limit):
+    storage, _ = filled_storage
+    start, end = datetime(2026, 1, 5, 3), datetime(2026, 1, 7, 21)
+
+    full = [e for _, e in storage.iter_range('a', start, end, descending)]
+    pages = read_pages(storage, 'a', start, end, descending, limit)
+
+    assert len(full) == 22
+    assert [e for page in pages for e in page] == full
+    assert all(len(page) == limit for page in pages[:-1])
+    ordered = [e['timestamp_ms'] for e in full]
+    assert ordered == sorted(ordered, reverse=descending)
+
+
+def test_cursor_of_other_backend_is_rejected(filled_storage):
+    storage, _ = filled_storage
+    foreign = [1, 2] if storage.name == 'json' else ['2026-01-05', 1, 2]
+
+    with pytest.raises(ValueError):
+        storage.check_cursor(decode_cursor(encode_cursor(foreign)))
+    with pytest.raises(ValueError):
+        decode_cursor('pas-un-curseur!')
+
+
+def test_sqlite_close_closes_connections_of_all_threads(tmp_path):
+    storage = SqliteHistoryStorage(str(tmp_path / 'history.db'))
+    connections = [storage.connection()]
+
+    def read():
+        storage.get_day('2026-01-05')
+        connections.append(storage.connection())
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(connection) for connection in connections}) == 4
+
+    storage.close()
+
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+    # Le backend reste utilisable : nouvelle connexion à la demande
+    assert storage.get_day('2026-01-05') == []
+    storage.close()
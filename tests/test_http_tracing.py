@@ -0,0 +1,79 @@
+"""Vérifications HTTP tracées : spans resolve, connect et request."""
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from profiling import tracer
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def service(tmp_path):
+    from api import MonitoringService
+
+    enabled, capacity = tracer.enabled, tracer.spans.maxlen
+    tracer.configure(True, 100)
+    tracer.spans.clear()
+    service = MonitoringService(project_root=str(tmp_path), autostart=False)
+    yield service
+    service.stop_monitoring()
+    service.history_storage.close()
+    tracer.configure(enabled, capacity)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_http_check_records_resolve_and_connect(service, server):
+    tracer.bind('web')
+    # localhost peut d'abord résoudre en ::1 : les adresses sont essayées dans l'ordre
+    result = service.http_check(f"http://localhost:{server.server_port}/", timeout=2)
+    tracer.bind(None)
+
+    assert result['status'] == 'online'
+    spans = tracer.export('web')
+    assert [span['name'] for span in spans] == ['resolve', 'connect', 'request']
+    assert all(span['type'] == 'http' and span['error'] is None for span in spans)
+    assert spans[1]['addresses'] >= 1
+    assert spans[2]['duration_ms'] >= spans[1]['duration_ms']
+
+
+def test_refused_connection_is_traced(service):
+    result = service.http_check(f"http://127.0.0.1:{free_port()}/", timeout=2)
+
+    assert result['status'] == 'offline'
+    connect = next(span for span in tracer.export() if span['name'] == 'connect')
+    assert connect['error'] is not None
+
+
+def test_unknown_host(service):
+    result = service.http_check("http://nonexistent.invalid/", timeout=2)
+
+    assert result['status'] == 'offline'
+    resolve = next(span for span in tracer.export() if span['name'] == 'resolve')
+    assert resolve['error'] is not None
@@ -0,0 +1,207 @@
+"""Vérifications manuelles : regroupement, cache, limitation et tâches asynchrones."""
+import threading
+import time
+
+import pytest
+
+from manual_checks import Flight, ManualCheckRunner, RateLimited
+from results import CheckResult, Status
+
+PROBE = {"id": "web", "name": "Web", "type": "http", "target": "http://example.test"}
+
+
+class StubCheck:
+    """Compte les appels ; bloque tant que `gate` n'est pas ouverte"""
+
+    def __init__(self, blocking: bool = False):
+        self.calls = 0
+        self.gate = threading.Event()
+        if not blocking:
+            self.gate.set()
+        self.lock = threading.Lock()
+
+    def __call__(self, probe):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        self.gate.wait(5)
+        return CheckResult(probe, 1_700_000_000_000 + call, Status.ONLINE, response_time=12.5)
+
+
+@pytest.fixture
+def make_runner():
+    runners = []
+
+    def make(check, **settings):
+        runner = ManualCheckRunner(check, {"cache_ttl": 5, "min_interval": 10, **settings})
+        runners.append(runner)
+        return runner
+
+    yield make
+    for runner in runners:
+        runner.stop()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_concurrent_calls_share_one_check(make_runner):
+    check = StubCheck(blocking=True)
+    runner = make_runner(check)
+    outcomes = []
+
+    def call():
+        outcomes.append(runner.run(PROBE))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert wait_for(lambda: check.calls == 1)
+    time.sleep(0.1)  # laisse les autres appels rejoindre le vol en cours
+    check.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert check.calls == 1
+    assert len(outcomes) == 8
+    assert len({id(result) for result, _ in outcomes}) == 1
+    sources = sorted(source for _, source in outcomes)
+    assert sources.count('fresh') == 1
+    assert set(sources) <= {'fresh', 'coalesced', 'cache'}
+
+
+def test_cached_result_is_served_within_ttl(make_runner):
+    check = StubCheck()
+    runner = make_runner(check)
+
+    first, source = runner.run(PROBE)
+    again, cached = runner.run(PROBE)
+
+    assert source == 'fresh'
+    assert cached == 'cache'
+    assert again is first
+    assert check.calls == 1
+
+
+def test_rate_limited_serves_stale_result(make_runner):
+    check = StubCheck()
+    runner = make_runner(check, cache_ttl=0.05, min_interval=10)
+
+    first, _ = runner.run(PROBE)
+    time.sleep(0.1)
+    stale, source = runner.run(PROBE)
+
+    assert source == 'stale'
+    assert stale is first
+    assert check.calls == 1
+
+
+def test_rate_limited_without_result_raises(make_runner):
+    check = StubCheck()
+    runner = make_runner(check, min_interval=10)
+    runner.last_started['web'] = time.monotonic()
+
+    with pytest.raises(RateLimited) as raised:
+        runner.run(PROBE)
+    assert 0 < raised.value.retry_after <= 10
+    assert check.calls == 0
+
+
+def test_flight_wait_times_out():
+    with pytest.raises(TimeoutError):
+        Flight().wait(0.05)
+
+
+def test_submit_after_stop_fails_the_job(make_runner):
+    runner = make_runner(StubCheck())
+    runner.stop()
+
+    job = runner.submit(PROBE)
+
+    assert job['status'] == 'error'
+    assert 'web' not in runner.flights
+
+
+def test_stop_cancels_queued_flights(make_runner):
+    check = StubCheck(blocking=True)
+    runner = make_runner(check, workers=1)
+    busy = runner.submit({**PROBE, "id": "busy"})
+    queued = runner.submit(PROBE)
+    assert wait_for(lambda: check.calls == 1)
+
+    runner.stop()
+    check.gate.set()
+
+    assert runner.get_job(queued['job_id'])['status'] == 'error'
+    assert wait_for(lambda: runner.get_job(busy['job_id'])['status'] == 'done')
+    assert runner.flights == {}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import api
+
+    service = api.MonitoringService(project_root=str(tmp_path), autostart=False)
+    service.probes = [PROBE]
+    check = StubCheck()
+    service.manual_checks.stop()
+    service.manual_checks = ManualCheckRunner(check, {"cache_ttl": 0.05, "min_interval": 10})
+    monkeypatch.setattr(api, 'monitoring_service', service)
+    yield api.app.test_client(), check
+    service.stop_monitoring()
+    service.history_storage.close()
+
+
+def test_api_manual_check_sources(client):
+    http, check = client
+
+    fresh = http.post('/api/check/web')
+    cached = http.post('/api/check/web')
+    time.sleep(0.1)
+    stale = http.post('/api/check/web')
+
+    assert fresh.status_code == 200
+    assert fresh.headers['X-Check-Source'] == 'fresh'
+    assert fresh.get_json()['status'] == 'online'
+    assert cached.headers['X-Check-Source'] == 'cache'
+    assert stale.status_code == 200
+    assert stale.headers['X-Check-Source'] == 'stale'
+    assert stale.get_json() == fresh.get_json()
+    assert check.calls == 1
+    assert http.post('/api/check/missing').status_code == 404
+
+
+def test_api_rate_limited_without_result(client):
+    import api
+
+    http, _ = client
+    api.monitoring_service.manual_checks.last_started['web'] = time.monotonic()
+
+    response = http.post('/api/check/web')
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_api_async_job(client):
+    http, check = client
+
+    response = http.post('/api/check/web?async=1')
+    assert response.status_code in (200, 202)
+    job = response.get_json()
+    assert response.headers['Location'] == f"/api/check/jobs/{job['job_id']}"
+    assert job['source'] == 'fresh'
+    assert job['created_at'][-6] in '+-'  # horodatage avec décalage
+
+    assert wait_for(lambda: http.get(response.headers['Location']).get_json()['status'] == 'done')
+    done = http.get(response.headers['Location']).get_json()
+    assert done['result']['id'] == 'web'
+    assert done['result']['status'] == 'online'
+    assert check.calls == 1
+    assert http.get('/api/check/jobs/unknown').status_code == 404
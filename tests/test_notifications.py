@@ -0,0 +1,196 @@
+"""Notifications contre un webhook local (serveur HTTP de substitution)."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import metrics
+from notifications import NotificationDispatcher
+
+
+class StandInWebhook:
+    """Enregistre les lots reçus ; les `failures` premiers appels répondent 500"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+        self.batches = []
+        self.lock = threading.Lock()
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                with webhook.lock:
+                    webhook.calls += 1
+                    failed = webhook.calls <= webhook.failures
+                    if not failed:
+                        webhook.batches.append(json.loads(body))
+                self.send_response(500 if failed else 204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def wait_batches(self, count: int, timeout: float = 5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.batches) >= count:
+                    return list(self.batches)
+            time.sleep(0.02)
+        return list(self.batches)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def make_dispatcher():
+    started = []
+
+    def make(webhook, start=True, **settings):
+        dispatcher = NotificationDispatcher({
+            "batch_window": 0.2,
+            "backoff_base": 0.05,
+            "backoff_max": 0.1,
+            **settings,
+            "destinations": [{"id": "stand-in", "url": webhook.url}]
+        })
+        if start:
+            dispatcher.start()
+        started.append((dispatcher, webhook))
+        return dispatcher
+
+    yield make
+    for dispatcher, webhook in started:
+        dispatcher.stop()
+        webhook.stop()
+
+
+def transition(probe_id, previous, status):
+    return {"probe_id": probe_id, "previous_status": previous, "status": status}
+
+
+def test_transitions_are_coalesced_per_probe(make_dispatcher):
+    webhook = StandInWebhook()
+    dispatcher = make_dispatcher(webhook)
+
+    dispatcher.notify(transition("p", "online", "offline"))
+    dispatcher.notify(transition("p", "offline", "online"))
+    dispatcher.notify(transition("p", "online", "offline"))
+    dispatcher.notify(transition("q", "online", "slow"))
+
+    batches = webhook.wait_batches(1)
+    assert len(batches) == 1
+    assert batches[0]["source"] == "uptimecore"
+    events = {event["probe_id"]: event for event in batches[0]["events"]}
+    assert events["p"]["transitions"] == 3
+    assert events["p"]["flapping"] is True
+    assert events["p"]["previous_status"] == "online"
+    assert events["p"]["status"] == "offline"
+    assert events["q"]["transitions"] == 1
+    assert events["q"]["flapping"] is False
+
+
+def test_failed_delivery_is_retried(make_dispatcher):
+    webhook = StandInWebhook(failures=2)
+    dispatcher = make_dispatcher(webhook, max_retries=3)
+
+    dispatcher.notify(transition("p", "online", "offline"))
+
+    batches = webhook.wait_batches(1)
+    assert webhook.calls == 3
+    assert [event["probe_id"] for event in batches[0]["events"]] == ["p"]
+
+
+def test_delivery_gives_up_after_max_retries(make_dispatcher):
+    webhook = StandInWebhook(failures=10)
+    dispatcher = make_dispatcher(webhook, max_retries=1)
+
+    dispatcher.notify(transition("p", "online", "offline"))
+
+    time.sleep(0.8)
+    assert webhook.calls == 2
+    assert webhook.batches == []
+
+
+def dropped(destination='*'):
+    return metrics.notifications_total._values.get((destination, 'dropped'), 0)
+
+
+def test_notify_never_blocks_when_queue_is_full(make_dispatcher):
+    webhook = StandInWebhook()
+    # Répartiteur pas encore démarré : rien ne vide la file d'une place
+    dispatcher = make_dispatcher(webhook, start=False, queue_size=1)
+    dropped_before = dropped()
+
+    started = time.perf_counter()
+    for index in range(50):
+        dispatcher.notify(transition(f"p{index}", "online", "offline"))
+    assert time.perf_counter() - started < 0.1
+    assert dropped() - dropped_before == 49
+
+    dispatcher.start()
+    batches = webhook.wait_batches(1)
+    time.sleep(0.3)
+    assert len(webhook.batches) == 1
+    assert [event["probe_id"] for event in batches[0]["events"]] == ["p0"]
+
+
+def test_reload_hands_queued_events_over(make_dispatcher):
+    webhook = StandInWebhook()
+    previous = make_dispatcher(webhook, batch_window=5)
+    previous.notify(transition("p", "online", "offline"))
+    previous.notify(transition("q", "online", "slow"))
+    time.sleep(0.1)  # le premier événement est en cours de regroupement
+    previous.notify(transition("p", "offline", "online"))
+
+    previous.stop()
+    successor = make_dispatcher(webhook, start=False)
+    previous.hand_over(successor)
+    previous.notify(transition("r", "online", "error"))  # reçu après le transfert
+    successor.start()
+
+    batches = webhook.wait_batches(1)
+    assert len(batches) == 1
+    events = {event["probe_id"]: event for event in batches[0]["events"]}
+    assert set(events) == {"p", "q", "r"}
+    assert events["p"]["transitions"] == 2
+    assert events["p"]["status"] == "online"
+
+
+def test_reload_hands_undelivered_batches_to_same_destination(make_dispatcher):
+    failing = StandInWebhook(failures=100)
+    previous = make_dispatcher(failing, max_retries=10, backoff_base=5, backoff_max=5, batch_window=0.05)
+    previous.notify(transition("p", "online", "offline"))
+    assert failing.wait_batches(1, timeout=0.5) == []  # premier essai échoué, attente du suivant
+
+    previous.stop()
+    webhook = StandInWebhook()
+    successor = make_dispatcher(webhook, start=False)
+    previous.hand_over(successor)
+    successor.start()
+
+    batches = webhook.wait_batches(1)
+    assert [event["probe_id"] for event in batches[0]["events"]] == ["p"]
+    assert failing.calls == 1
+
+
+def test_stop_unregisters_queue_gauges(make_dispatcher):
+    dispatcher = make_dispatcher(StandInWebhook())
+    destination = dispatcher.destinations[0]
+    assert metrics._queue_sources['notifications:stand-in'] == destination.queue.qsize
+
+    dispatcher.stop()
+
+    assert metrics._queue_sources.get('notifications') != dispatcher.queue.qsize
+    assert 'notifications:stand-in' not in metrics._queue_sources
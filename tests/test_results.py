@@ -0,0 +1,79 @@
+"""Résultats compacts : statut énuméré, sérialisation et horodatages."""
+import json
+from datetime import datetime
+
+import pytest
+
+from results import CheckResult, Status, iso_timestamp, parse_timestamp_ms
+
+PROBE = {"id": "web", "name": "Web", "type": "http", "target": "http://example.test", "interval": 30}
+TIMESTAMP_MS = 1_767_614_400_123
+
+
+def test_status_compares_and_serializes_as_string():
+    assert Status.ONLINE == "online"
+    assert str(Status.TIMEOUT) == "timeout"
+    assert json.dumps({"status": Status.SLOW}) == '{"status": "slow"}'
+    assert Status.parse("offline") is Status.OFFLINE
+    assert Status.parse("bogus") is Status.UNKNOWN
+    assert Status.parse(None) is Status.UNKNOWN
+
+
+def test_iso_timestamp_round_trip():
+    text = iso_timestamp(TIMESTAMP_MS)
+
+    local = datetime.fromtimestamp(TIMESTAMP_MS / 1000).astimezone()
+    assert datetime.fromisoformat(text).utcoffset() == local.utcoffset()
+    assert text[-6] in '+-'
+    assert '.123' in text
+    assert parse_timestamp_ms(text) == TIMESTAMP_MS
+
+
+def test_from_check_splits_details():
+    result = CheckResult.from_check(PROBE, TIMESTAMP_MS, {
+        "status": "slow", "response_time": 812.5, "error": None,
+        "http_status": 200, "timestamp": "ignoré", "id": "ignoré"
+    })
+
+    assert result.status is Status.SLOW
+    assert result.response_time == 812.5
+    assert result.details == (("http_status", 200),)
+    assert result.id == "web"
+    assert result.probe is PROBE
+
+
+def test_to_dict_and_back():
+    result = CheckResult(PROBE, TIMESTAMP_MS, Status.ERROR, 15.0, "HTTP 503", (("http_status", 503),))
+
+    data = result.to_dict()
+
+    assert data == {
+        "id": "web", "name": "Web", "type": "http", "target": "http://example.test",
+        "timestamp": iso_timestamp(TIMESTAMP_MS), "timestamp_ms": TIMESTAMP_MS,
+        "status": "error", "response_time": 15.0, "error": "HTTP 503", "http_status": 503
+    }
+    assert "interval" not in data
+
+    restored = CheckResult.from_dict(json.loads(json.dumps(data)), PROBE, stale=True)
+    assert restored.to_dict() == {**data, "stale": True}
+
+
+def test_from_dict_without_timestamp_ms():
+    data = {"id": "web", "timestamp": "2026-01-05T12:00:00.500+00:00", "status": "online"}
+
+    result = CheckResult.from_dict(data, PROBE)
+
+    assert result.timestamp_ms == parse_timestamp_ms(data["timestamp"])
+    assert result.stale is False
+    assert "stale" not in result.to_dict()
+
+
+@pytest.mark.parametrize('details', [(), (("rcode", "NOERROR"), ("answers", [{"type": "A", "value": "10.0.0.1"}]))])
+def test_row_round_trip(details):
+    result = CheckResult(PROBE, TIMESTAMP_MS, Status.ONLINE, 3.25, None, details)
+
+    row = json.loads(json.dumps(result.to_row()))
+    restored = CheckResult.from_row(row, PROBE, stale=True)
+
+    assert restored.to_dict() == {**result.to_dict(), "stale": True}
+    assert restored.status is Status.ONLINE
@@ -0,0 +1,115 @@
+"""Planification adaptative : confirmation des échecs et allongement de l'intervalle."""
+import pytest
+
+from scheduler import AdaptivePolicy, ProbeSchedule
+
+
+@pytest.fixture
+def policy():
+    return AdaptivePolicy({"max_interval": 100, "stretch_factor": 2, "stable_checks": 2,
+                           "confirm_interval": 1, "confirm_retries": 2})
+
+
+def started(now=0.0, base_interval=10.0):
+    schedule = ProbeSchedule(base_interval, now)
+    schedule.on_result(AdaptivePolicy(), None, "online", now)
+    return schedule
+
+
+def test_first_result_is_recorded(policy):
+    schedule = ProbeSchedule(10, 0)
+
+    assert schedule.on_result(policy, None, "online", 0) == "record"
+    assert schedule.next_check == 10
+
+
+def test_failure_is_confirmed_before_recording(policy):
+    schedule = started()
+
+    assert schedule.on_result(policy, "online", "offline", 10) == "confirming"
+    assert schedule.pending_status == "offline"
+    assert schedule.next_check == 11
+    assert schedule.on_result(policy, "online", "offline", 11) == "confirming"
+    assert schedule.next_check == 12
+    assert schedule.on_result(policy, "online", "timeout", 12) == "record"
+    assert schedule.confirming == 0
+    assert schedule.pending_status is None
+    assert schedule.next_check == 22
+
+
+def test_recovery_during_confirmation_is_a_false_positive(policy):
+    schedule = started()
+
+    assert schedule.on_result(policy, "online", "error", 10) == "confirming"
+    assert schedule.on_result(policy, "online", "online", 11) == "false_positive"
+    assert schedule.confirming == 0
+    assert schedule.interval == 10
+    assert schedule.next_check == 21
+
+
+def test_non_failure_change_is_recorded_at_once(policy):
+    schedule = started()
+
+    assert schedule.on_result(policy, "online", "slow", 10) == "record"
+    # Retour d'un échec vers un statut sain : pas de confirmation non plus
+    assert schedule.on_result(policy, "offline", "online", 20) == "record"
+
+
+def test_no_confirmation_when_retries_disabled():
+    schedule = started()
+    policy = AdaptivePolicy({"confirm_retries": 0})
+
+    assert schedule.on_result(policy, "online", "offline", 10) == "record"
+
+
+def test_stable_status_stretches_interval_up_to_max(policy):
+    schedule = started()
+    intervals = []
+    now = 10.0
+    for _ in range(8):
+        assert schedule.on_result(policy, "online", "online", now) == "stable"
+        intervals.append(schedule.interval)
+        now = schedule.next_check
+
+    assert intervals == [10, 20, 40, 80, 100, 100, 100, 100]
+    assert schedule.next_check == now
+
+
+def test_change_resets_stretched_interval(policy):
+    schedule = started()
+    for now in range(10, 60, 10):
+        schedule.on_result(policy, "online", "online", now)
+    assert schedule.interval > 10
+
+    assert schedule.on_result(policy, "online", "slow", 100) == "record"
+    assert schedule.interval == 10
+    assert schedule.stable_count == 0
+    assert schedule.next_check == 110
+
+
+def test_max_interval_below_base_keeps_base():
+    schedule = started(base_interval=600)
+    policy = AdaptivePolicy({"max_interval": 300, "stable_checks": 1})
+
+    schedule.on_result(policy, "online", "online", 600)
+
+    assert schedule.interval == 600
+
+
+def test_disabled_policy_uses_base_interval():
+    schedule = started()
+    policy = AdaptivePolicy({"enabled": False})
+
+    assert schedule.on_result(policy, "online", "online", 10) == "stable"
+    assert schedule.on_result(policy, "online", "offline", 20) == "record"
+    assert schedule.next_check == 30
+    assert schedule.interval == 10
+
+
+def test_probe_overrides(policy):
+    probe_policy = policy.for_probe({"id": "p", "adaptive": {"confirm_retries": 0, "max_interval": 50}})
+
+    assert probe_policy.confirm_retries == 0
+    assert probe_policy.max_interval == 50
+    assert probe_policy.stretch_factor == 2
+    assert policy.for_probe({"id": "q"}) is policy
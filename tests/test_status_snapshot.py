@@ -0,0 +1,116 @@
+"""Démarrage à chaud depuis l'instantané de statut."""
+import json
+from datetime import datetime
+
+import pytest
+
+from clock import SimulatedClock
+from results import CheckResult, Status
+
+PROBES = [
+    {"id": "web", "name": "Web", "type": "http", "target": "http://example.test"},
+    {"id": "db", "name": "Base", "type": "ping", "target": "10.0.0.2"}
+]
+
+
+@pytest.fixture
+def project(tmp_path):
+    with open(tmp_path / 'config.json', 'w', encoding='utf-8') as f:
+        json.dump({"probes": PROBES, "settings": {}}, f)
+    return tmp_path
+
+
+@pytest.fixture
+def make_service(project):
+    from api import MonitoringService
+
+    services = []
+
+    def make(clock):
+        service = MonitoringService(clock=clock, project_root=str(project), autostart=False)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.stop_monitoring()
+        service.history_storage.close()
+
+
+def checked(service, probe, status, **details):
+    result = CheckResult(probe, service.clock.time_ms(), status, response_time=42.0,
+                         details=tuple(details.items()))
+    service.process_result(probe, result, service.clock.time())
+    return result
+
+
+def test_snapshot_restores_status_as_stale(make_service):
+    clock = SimulatedClock(datetime(2026, 1, 5, 12).timestamp())
+    first = make_service(clock)
+    web = checked(first, PROBES[0], Status.ONLINE, http_status=200)
+    checked(first, PROBES[1], Status.OFFLINE)
+    first.save_status_snapshot()
+
+    clock.advance(600)
+    second = make_service(clock)
+
+    assert set(second.current_status) == {"web", "db"}
+    restored = second.current_status["web"]
+    assert restored.stale is True
+    assert restored.to_dict() == {**web.to_dict(), "stale": True}
+    assert second.current_status["db"].status is Status.OFFLINE
+    assert second.previous_status == {"web": "online", "db": "offline"}
+
+
+def test_first_check_after_warm_start_clears_stale_without_new_transition(make_service):
+    clock = SimulatedClock(datetime(2026, 1, 5, 12).timestamp())
+    first = make_service(clock)
+    checked(first, PROBES[0], Status.ONLINE)
+    first.save_status_snapshot()
+    history_before = first.get_history()
+
+    clock.advance(60)
+    second = make_service(clock)
+    fresh = checked(second, PROBES[0], Status.ONLINE)
+
+    assert second.current_status["web"] is fresh
+    assert second.current_status["web"].stale is False
+    # Statut inchangé depuis l'instantané : pas de nouvel état "initial" dans l'historique
+    assert second.get_history() == history_before
+
+
+def test_stale_snapshot_is_ignored(make_service):
+    clock = SimulatedClock(datetime(2026, 1, 5, 12).timestamp())
+    first = make_service(clock)
+    checked(first, PROBES[0], Status.ONLINE)
+    first.save_status_snapshot()
+
+    clock.advance(first.snapshot_max_age + 1)
+    second = make_service(clock)
+
+    assert second.current_status == {}
+    assert second.previous_status == {}
+
+
+def test_snapshot_skips_removed_probes_and_reads_old_format(make_service, project):
+    clock = SimulatedClock(datetime(2026, 1, 5, 12).timestamp())
+    snapshot = {
+        "saved_at": clock.time() - 30,
+        "probes": {
+            "gone": {"result": [clock.time_ms(), "online", 1.0, None, None], "previous_status": "online"},
+            # Format d'avant les résultats compacts : statut complet en dictionnaire
+            "db": {"status": {"id": "db", "timestamp": "2026-01-05T11:59:00", "status": "timeout",
+                              "response_time": None, "error": "Timeout"},
+                   "previous_status": "timeout"}
+        }
+    }
+    (project / 'history').mkdir()
+    with open(project / 'history' / 'status_snapshot.json', 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+
+    service = make_service(clock)
+
+    assert set(service.current_status) == {"db"}
+    assert service.current_status["db"].status is Status.TIMEOUT
+    assert service.current_status["db"].error == "Timeout"
+    assert service.current_status["db"].stale is True